@@ -1,128 +1,208 @@
-import pandas as pd
+import os
 import dash
 import dash_bootstrap_components as dbc
-from dash import html, dcc, callback, Input, Output
+from dash import html, dcc, callback, Input, Output, State
+from flask import jsonify
 from components.tables import build_overview_grid
 from components.charts import (
-    create_bar_chart,
-    create_bubble_chart,
+    bar_chart_figure,
+    bubble_chart_figure,
+    cached_figure,
     CHART_TARGET_OPTIONS,
+    FIGURE_CACHE,
 )
-from client import get_company_overview, MOCK_OVERVIEW
+from client import DATA_PROVIDER, cache_stats
+from fixtures import FIXTURE_SYMBOLS, synthetic_symbols
+from store import VendorStore
+from warmer import CacheWarmer
 
 SYMBOLS = ["TEL", "ST", "DD", "CE", "LYB"]
+if DATA_PROVIDER == "fixtures":
+    # Offline load testing: FIXTURE_SYMBOLS synthetic vendors, no network
+    SYMBOLS = synthetic_symbols(FIXTURE_SYMBOLS)
+# How often the page checks the store for a newer snapshot
+STORE_POLL_MS = 60 * 1000
+DEBUG = os.getenv("DASH_DEBUG", "1") == "1"
+# With debug on, `python app.py` runs twice: a reloader parent that only
+# watches files, and the child (WERKZEUG_RUN_MAIN set) that serves requests.
+# Only the serving process may fetch or warm, or the call quota is doubled.
+RELOADER_PARENT = (
+    __name__ == "__main__" and DEBUG and os.getenv("WERKZEUG_RUN_MAIN") != "true"
+)
 
 app = dash.Dash(__name__, external_stylesheets=[dbc.themes.DARKLY])
 app.title = "WindBorne Vendor Dashboard"
 
-overviews = [get_company_overview(s) for s in SYMBOLS]
-overview_df = pd.DataFrame(MOCK_OVERVIEW)
-overview_table = build_overview_grid(overview_df)
+# Keep the watched symbols' cache entries refreshed ahead of their TTL
+warmer = CacheWarmer(SYMBOLS)
+
+# Typed vendor frame; rows are upserted as their cache entries change
+store = VendorStore(SYMBOLS)
+if not RELOADER_PARENT:
+    warmer.start()
+    store.load()
+
+def cached_graph(graph_id: str, build, *fields):
+    """dcc.Graph for the current snapshot; see cached_figure."""
+    figure = cached_figure(store.snapshot(), graph_id, build, *fields)
+    return dcc.Graph(figure=figure, id=graph_id)
+
 
 # Initial charts with default target
 bar_chart_default = "MarketCapitalization"
 bubble_chart_x_default = 'ProfitMargin'
 bubble_chart_y_default = "RevenueTTM"
-initial_bar_chart = create_bar_chart(overview_df, bar_chart_default)
-initial_bubble_chart = create_bubble_chart(
-    overview_df, bubble_chart_x_default, bubble_chart_y_default
-)
 
-app.layout = dbc.Container(
-    [
-        dbc.Row(
-            [dbc.Col(html.H1("WindBorne Vendor Dashboard"), width=12)], justify="center"
-        ),
-        dbc.Row([
-            dbc.Col([
-                dbc.Button("Download CSV", id="btn-export-csv", color="info", className="mt-2"),
-                dcc.Download(id="download-overview-csv")
-            ], width={"size": 10, "offset": 0})
-        ], className="mb-4"),
-        dbc.Row([dbc.Col(overview_table, id="overview-table-section")]),
-        html.Hr(),
-        dbc.Row(
-            [
-                dbc.Col(
-                    [
-                        html.H5("Bar Chart"),
-                        html.Label(
-                            "Select Metric:",
-                            style={"color": "#BDC3C7", "marginBottom": "0.5rem"},
-                        ),
-                        dcc.Dropdown(
-                            id="bar-chart-dropdown",
-                            options=CHART_TARGET_OPTIONS,
-                            value=bar_chart_default,
-                            clearable=False,
-                            style={"marginBottom": "1rem", "color": "#000"},
-                        ),
-                        html.Div(id="bar-chart-container"),
-                    ],
-                    width=6,
-                ),
-                dbc.Col(
-                    [
-                        html.H5("Bubble Chart"),
-                        html.Label(
-                            "Select Metrics:",
-                            style={"color": "#BDC3C7", "marginBottom": "0.5rem"},
-                        ),
-                        dbc.Row(
-                            [
-                                dbc.Col(
-                                    dcc.Dropdown(
-                                        id="bubble-chart-x-dropdown",
-                                        options=CHART_TARGET_OPTIONS,
-                                        value=bubble_chart_x_default,
-                                        clearable=False,
-                                        style={"marginBottom": "1rem", "color": "#000"},
+
+def serve_layout():
+    """Built on every page load, so a new page starts from the current snapshot
+    instead of the one the process started with."""
+    store.reconcile()
+    snapshot = store.snapshot()
+    return dbc.Container(
+        [
+            dbc.Row(
+                [dbc.Col(html.H1("WindBorne Vendor Dashboard"), width=12)], justify="center"
+            ),
+            dbc.Row([
+                dbc.Col([
+                    dbc.Button("Download CSV", id="btn-export-csv", color="info", className="mt-2"),
+                    dcc.Download(id="download-overview-csv")
+                ], width={"size": 10, "offset": 0})
+            ], className="mb-4"),
+            dcc.Store(id="store-version", data=snapshot.version),
+            dcc.Interval(id="store-poll", interval=STORE_POLL_MS),
+            dbc.Row(
+                [
+                    dbc.Col(
+                        build_overview_grid(snapshot.view), id="overview-table-section"
+                    )
+                ]
+            ),
+            html.Hr(),
+            dbc.Row(
+                [
+                    dbc.Col(
+                        [
+                            html.H5("Bar Chart"),
+                            html.Label(
+                                "Select Metric:",
+                                style={"color": "#BDC3C7", "marginBottom": "0.5rem"},
+                            ),
+                            dcc.Dropdown(
+                                id="bar-chart-dropdown",
+                                options=CHART_TARGET_OPTIONS,
+                                value=bar_chart_default,
+                                clearable=False,
+                                style={"marginBottom": "1rem", "color": "#000"},
+                            ),
+                            html.Div(id="bar-chart-container"),
+                        ],
+                        width=6,
+                    ),
+                    dbc.Col(
+                        [
+                            html.H5("Bubble Chart"),
+                            html.Label(
+                                "Select Metrics:",
+                                style={"color": "#BDC3C7", "marginBottom": "0.5rem"},
+                            ),
+                            dbc.Row(
+                                [
+                                    dbc.Col(
+                                        dcc.Dropdown(
+                                            id="bubble-chart-x-dropdown",
+                                            options=CHART_TARGET_OPTIONS,
+                                            value=bubble_chart_x_default,
+                                            clearable=False,
+                                            style={"marginBottom": "1rem", "color": "#000"},
+                                        ),
+                                        width=6,
                                     ),
-                                    width=6,
-                                ),
-                                dbc.Col(
-                                    dcc.Dropdown(
-                                        id="bubble-chart-y-dropdown",
-                                        options=CHART_TARGET_OPTIONS,
-                                        value=bubble_chart_y_default,
-                                        clearable=False,
-                                        style={"marginBottom": "1rem", "color": "#000"},
+                                    dbc.Col(
+                                        dcc.Dropdown(
+                                            id="bubble-chart-y-dropdown",
+                                            options=CHART_TARGET_OPTIONS,
+                                            value=bubble_chart_y_default,
+                                            clearable=False,
+                                            style={"marginBottom": "1rem", "color": "#000"},
+                                        ),
+                                        width=6,
                                     ),
-                                    width=6,
-                                ),
-                            ],
-                            className="g-2",
-                        ),
-                        html.Div(id="bubble-chart-container"),
-                    ],
-                    width=6,
-                ),
-            ]
-        ),
-    ],
-    fluid=True,
+                                ],
+                                className="g-2",
+                            ),
+                            html.Div(id="bubble-chart-container"),
+                        ],
+                        width=6,
+                    ),
+                ]
+            ),
+        ],
+        fluid=True,
+    )
+
+
+app.layout = serve_layout
+
+
+# Only bump the page's version when the store has published a new snapshot
+@callback(
+    Output("store-version", "data"),
+    Input("store-poll", "n_intervals"),
+    State("store-version", "data"),
+)
+def poll_store(n_intervals, seen_version):
+    # Picks up overviews other processes refreshed in a shared cache
+    store.reconcile()
+    version = store.version
+    return dash.no_update if version == seen_version else version
+
+
+@callback(
+    Output("overview-table-section", "children"),
+    Input("store-version", "data"),
+    prevent_initial_call=True,
 )
+def update_overview_table(version):
+    return build_overview_grid(store.snapshot().view)
 
 
 # Callback to update charts based on dropdown selection
 @callback(
-    Output("bar-chart-container", "children"), Input("bar-chart-dropdown", "value")
+    Output("bar-chart-container", "children"),
+    Input("bar-chart-dropdown", "value"),
+    Input("store-version", "data"),
 )
-def update_bar_chart(selected_target):
-    bar_chart = create_bar_chart(overview_df, selected_target)
-    return bar_chart
+def update_bar_chart(selected_target, version):
+    return cached_graph("bar-chart", bar_chart_figure, selected_target)
 
 
 @callback(
     Output("bubble-chart-container", "children"),
     Input("bubble-chart-x-dropdown", "value"),
     Input("bubble-chart-y-dropdown", "value"),
+    Input("store-version", "data"),
 )
-def bubble_bar_chart(selected_target_x, selected_target_y):
-    bubble_chart = create_bubble_chart(
-        overview_df, selected_target_x, selected_target_y
+def bubble_bar_chart(selected_target_x, selected_target_y, version):
+    return cached_graph(
+        "bubble-chart", bubble_chart_figure, selected_target_x, selected_target_y
     )
-    return bubble_chart
+
+@app.server.route("/warmer/status")
+def warmer_status():
+    return jsonify(warmer.status())
+
+
+@app.server.route("/store/status")
+def store_status():
+    return jsonify(store.status())
+
+
+@app.server.route("/cache/stats")
+def cache_stats_route():
+    return jsonify({**cache_stats(), "figures": FIGURE_CACHE.stats()})
+
 
 @callback(
     Output("download-overview-csv", "data"),
@@ -130,8 +210,9 @@ def bubble_bar_chart(selected_target_x, selected_target_y):
     prevent_initial_call=True
 )
 def export_overview_csv(n_clicks):
-    return dcc.send_data_frame(overview_df.to_csv, "vendor_overview.csv", index=False)
+    frame = store.snapshot().frame
+    return dcc.send_data_frame(frame.to_csv, "vendor_overview.csv", index=False)
 
 
 if __name__ == "__main__":
-    app.run(debug=True, host="0.0.0.0", port=7860)
+    app.run(debug=DEBUG, host="0.0.0.0", port=7860)
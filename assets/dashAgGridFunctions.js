@@ -12,3 +12,9 @@ dagfuncs.PCT = function (val) {
   if (val === null || val === undefined || isNaN(val)) return val;
   return new Intl.NumberFormat("en-US", { style: "percent", maximumFractionDigits: 1 }).format(val);
 };
+
+// Plain number formatter, two decimals (e.g., 12.3456 -> 12.35)
+dagfuncs.NUM = function (val) {
+  if (val === null || val === undefined || isNaN(val)) return val;
+  return new Intl.NumberFormat("en-US", { maximumFractionDigits: 2 }).format(val);
+};
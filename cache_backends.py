@@ -0,0 +1,960 @@
+import os
+import sys
+import json
+import time
+import zlib
+import hashlib
+import struct
+import logging
+import sqlite3
+import threading
+from pathlib import Path
+
+try:
+    import zstandard
+except ImportError:  # optional, zlib is used without it
+    zstandard = None
+
+try:
+    import lmdb
+except ImportError:  # optional, only needed for CACHE_BACKEND=lmdb
+    lmdb = None
+
+try:
+    import redis
+except ImportError:  # optional, only needed for CACHE_BACKEND=redis
+    redis = None
+
+logger = logging.getLogger(__name__)
+
+# Payload codec for new cache entries: zstd (needs `zstandard`), zlib or none
+CACHE_COMPRESSION = os.getenv("CACHE_COMPRESSION", "zlib")
+# Free pages returned to the filesystem per SQLite compaction
+CACHE_VACUUM_PAGES = int(os.getenv("CACHE_VACUUM_PAGES", "2000"))
+
+# (function, symbol, params_hash)
+Key = tuple[str, str, str]
+
+# Stored payload: magic, format version, codec id, then the encoded JSON body
+_PAYLOAD_MAGIC = b"AV"
+_PAYLOAD_FORMAT = 1
+_CODECS = {"none": 0, "zlib": 1, "zstd": 2}
+if CACHE_COMPRESSION not in _CODECS:
+    logger.warning("Unknown CACHE_COMPRESSION=%r, using zlib", CACHE_COMPRESSION)
+    CACHE_COMPRESSION = "zlib"
+elif CACHE_COMPRESSION == "zstd" and zstandard is None:
+    logger.warning("CACHE_COMPRESSION=zstd but zstandard is not installed, using zlib")
+    CACHE_COMPRESSION = "zlib"
+
+
+def encode_payload(payload: dict, codec: str | None = None) -> bytes:
+    codec = codec or CACHE_COMPRESSION
+    body = json.dumps(payload, separators=(",", ":")).encode()
+    if codec == "zlib":
+        body = zlib.compress(body, 6)
+    elif codec == "zstd":
+        body = zstandard.ZstdCompressor(level=3).compress(body)
+    header = _PAYLOAD_MAGIC + bytes((_PAYLOAD_FORMAT, _CODECS[codec]))
+    return header + body
+
+
+def payload_digest(payload: dict) -> str:
+    """Content hash of a payload, independent of key order and codec."""
+    body = json.dumps(payload, sort_keys=True, separators=(",", ":")).encode()
+    return hashlib.blake2b(body, digest_size=16).hexdigest()
+
+
+def decode_payload(blob: bytes) -> dict | None:
+    """Inverse of encode_payload; None for anything this build cannot read."""
+    if len(blob) < 4 or blob[:2] != _PAYLOAD_MAGIC or blob[2] != _PAYLOAD_FORMAT:
+        return None
+    codec, body = blob[3], blob[4:]
+    try:
+        if codec == _CODECS["zlib"]:
+            body = zlib.decompress(body)
+        elif codec == _CODECS["zstd"]:
+            if zstandard is None:
+                return None
+            body = zstandard.ZstdDecompressor().decompress(body)
+        elif codec != _CODECS["none"]:
+            return None
+        return json.loads(body)
+    except (zlib.error, ValueError) as exc:
+        # json.JSONDecodeError and zstandard.ZstdError are both ValueErrors
+        logger.warning("Unreadable cache payload: %s", exc)
+        return None
+
+
+def _meta(ts, expires, last_access, size, hits) -> dict:
+    return {
+        "fetched_at": ts,
+        "expires_at": expires,
+        "last_access": last_access,
+        "payload_size": size,
+        "hit_count": hits,
+    }
+
+
+class CacheBackend:
+    """Storage behind the api cache.
+
+    Payloads arrive already encoded (see encode_payload). Backends keep each
+    one with its bookkeeping: fetch time, expiry, last access, size and hit
+    count. They also provide the cross-process fetch lease.
+    """
+
+    name = "base"
+
+    def get_many(self, keys: list[Key]) -> dict[Key, tuple]:
+        """{key: (blob, fetched_at, expires_at, digest)} for the keys that exist."""
+        raise NotImplementedError
+
+    def get(self, key: Key) -> tuple | None:
+        return self.get_many([key]).get(key)
+
+    def set_many(self, rows: list[tuple[Key, bytes, int, int, str]]):
+        """Store (key, blob, fetched_at, expires_at, digest) rows, replacing
+        existing ones."""
+        raise NotImplementedError
+
+    def digests_many(self, keys: list[Key]) -> dict[Key, str | None]:
+        """Stored payload_digest per existing key, without loading payloads."""
+        raise NotImplementedError
+
+    def renew_many(self, rows: list[tuple[Key, int, int]]):
+        """Move (key, fetched_at, expires_at) forward for existing entries
+        whose payload is unchanged, leaving the payload untouched."""
+        raise NotImplementedError
+
+    def touch_many(self, touches: list[tuple[Key, int, int]]):
+        """Record (key, last_access, extra_hits) for existing entries."""
+        raise NotImplementedError
+
+    def metadata_many(self, keys: list[Key]) -> dict[Key, dict]:
+        raise NotImplementedError
+
+    def expiring(
+        self, before: int, functions: list[str] | None, limit: int | None
+    ) -> list[tuple[Key, int]]:
+        """(key, expires_at) for entries expiring before `before`, soonest first."""
+        raise NotImplementedError
+
+    def least_recently_used(self, limit: int) -> list[tuple[Key, int, int]]:
+        """(key, last_access, payload_size), oldest access first."""
+        raise NotImplementedError
+
+    def evict(self, max_rows: int, max_bytes: int) -> list[Key]:
+        """Drop least recently accessed entries until both budgets (0 = none)
+        hold; returns the evicted keys."""
+        raise NotImplementedError
+
+    def compact(self) -> dict:
+        """Return freed space to the OS where the store supports it."""
+        return {}
+
+    def acquire_lease(self, key: Key, owner: str, ttl: float) -> bool:
+        raise NotImplementedError
+
+    def release_lease(self, key: Key, owner: str):
+        raise NotImplementedError
+
+    def stats(self) -> dict:
+        """At least rows and payload_bytes, plus store-specific figures."""
+        raise NotImplementedError
+
+
+# Applied to every cache connection. WAL lets readers proceed while a writer
+# commits; synchronous=NORMAL is durable enough for a re-fetchable cache.
+SQLITE_PRAGMAS = {
+    "synchronous": "NORMAL",
+    "busy_timeout": 5000,
+    "temp_store": "MEMORY",
+    "cache_size": -16000,  # KiB
+    "mmap_size": 64 * 1024 * 1024,
+}
+
+# Stay well below SQLite's host-parameter limit
+_SQL_BATCH = 500
+
+_SQL_REPLACE = (
+    "REPLACE INTO api_cache (function, symbol, params_hash, payload, timestamp, "
+    "last_access, expires_at, payload_size, hit_count, content_hash) "
+    "VALUES (?, ?, ?, ?, ?, ?, ?, ?, 0, ?)"
+)
+
+
+def _migrate_v1_binary_payload(conn: sqlite3.Connection, backend: "SqliteBackend"):
+    # JSON TEXT in `response` -> encoded BLOB in `payload`
+    conn.execute("ALTER TABLE api_cache ADD COLUMN payload BLOB")
+    rows = conn.execute(
+        "SELECT rowid, response FROM api_cache WHERE response IS NOT NULL"
+    ).fetchall()
+    updates, broken = [], []
+    for rowid, text in rows:
+        try:
+            updates.append((encode_payload(json.loads(text)), rowid))
+        except json.JSONDecodeError:
+            broken.append((rowid,))
+    conn.executemany(
+        "UPDATE api_cache SET payload=?, response=NULL WHERE rowid=?", updates
+    )
+    conn.executemany("DELETE FROM api_cache WHERE rowid=?", broken)
+
+
+def _migrate_v2_last_access(conn: sqlite3.Connection, backend: "SqliteBackend"):
+    conn.execute("ALTER TABLE api_cache ADD COLUMN last_access INTEGER")
+    conn.execute("UPDATE api_cache SET last_access=timestamp")
+
+
+def _migrate_v3_entry_metadata(conn: sqlite3.Connection, backend: "SqliteBackend"):
+    for column in ("expires_at INTEGER", "payload_size INTEGER", "hit_count INTEGER"):
+        conn.execute(f"ALTER TABLE api_cache ADD COLUMN {column}")
+    functions = [r[0] for r in conn.execute("SELECT DISTINCT function FROM api_cache")]
+    conn.executemany(
+        "UPDATE api_cache SET expires_at=timestamp+? WHERE function=?",
+        ((backend.default_ttl(f), f) for f in functions),
+    )
+    conn.execute(
+        "UPDATE api_cache SET payload_size=COALESCE(LENGTH(payload), 0), hit_count=0"
+    )
+    # (last_access, payload_size) lets the evictor walk LRU order and sum
+    # sizes from the index alone
+    conn.execute(
+        "CREATE INDEX idx_api_cache_last_access ON api_cache (last_access, payload_size)"
+    )
+    conn.execute("CREATE INDEX idx_api_cache_expires_at ON api_cache (expires_at)")
+
+
+def _migrate_v4_content_hash(conn: sqlite3.Connection, backend: "SqliteBackend"):
+    # Left NULL for existing rows; their next refresh counts as a change
+    conn.execute("ALTER TABLE api_cache ADD COLUMN content_hash TEXT")
+
+
+# _MIGRATIONS[n] upgrades a cache at user_version n to n + 1
+_MIGRATIONS = [
+    _migrate_v1_binary_payload,
+    _migrate_v2_last_access,
+    _migrate_v3_entry_metadata,
+    _migrate_v4_content_hash,
+]
+
+
+class SqliteBackend(CacheBackend):
+    """The api_cache table in a local SQLite file, one connection per thread."""
+
+    name = "sqlite"
+
+    def __init__(self, path: Path, default_ttl=lambda function: 24 * 3600):
+        self.path = Path(path)
+        # Base TTL per function, used to backfill expiry for old rows
+        self.default_ttl = default_ttl
+        self._local = threading.local()
+        self._init()
+
+    def _connect(self) -> sqlite3.Connection:
+        # sqlite3 keeps a per-connection cache of prepared statements keyed by
+        # SQL text, so reusing the connection means hot queries compile once.
+        conn = sqlite3.connect(
+            str(self.path), timeout=5, check_same_thread=False, cached_statements=256
+        )
+        for name, value in SQLITE_PRAGMAS.items():
+            conn.execute(f"PRAGMA {name}={value}")
+        return conn
+
+    def conn(self) -> sqlite3.Connection:
+        # One long-lived connection per thread (and per process after a fork)
+        conn = getattr(self._local, "conn", None)
+        if conn is None or self._local.pid != os.getpid():
+            conn = self._local.conn = self._connect()
+            self._local.pid = os.getpid()
+        return conn
+
+    def _init(self):
+        conn = self.conn()
+        # auto_vacuum only takes effect on an empty file or after a full
+        # VACUUM; an existing cache pays that one-off cost here
+        if conn.execute("PRAGMA auto_vacuum").fetchone()[0] != 2:
+            try:
+                conn.execute("PRAGMA auto_vacuum=INCREMENTAL")
+                conn.execute("VACUUM")
+            except sqlite3.OperationalError as exc:
+                # Another process holds the database; the next start retries
+                logger.warning("Could not enable incremental vacuum: %s", exc)
+        with conn:
+            # Persistent on the database file, so only needs setting once
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute(
+                """
+                CREATE TABLE IF NOT EXISTS api_cache (
+                    function TEXT,
+                    symbol   TEXT,
+                    params_hash TEXT,
+                    response TEXT,
+                    timestamp INTEGER,
+                    PRIMARY KEY (function, symbol, params_hash)
+                )
+            """
+            )
+            conn.execute(
+                """
+                CREATE TABLE IF NOT EXISTS api_fetch_lease (
+                    function TEXT,
+                    symbol   TEXT,
+                    params_hash TEXT,
+                    owner TEXT,
+                    expires REAL,
+                    PRIMARY KEY (function, symbol, params_hash)
+                )
+            """
+            )
+        self._migrate()
+
+    def _migrate(self):
+        conn = self.conn()
+        # IMMEDIATE takes the write lock up front, so concurrently starting
+        # processes run each migration exactly once
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            version = conn.execute("PRAGMA user_version").fetchone()[0]
+            for target in range(version + 1, len(_MIGRATIONS) + 1):
+                _MIGRATIONS[target - 1](conn, self)
+                conn.execute(f"PRAGMA user_version={target}")
+        except BaseException:
+            conn.rollback()
+            raise
+        conn.commit()
+
+    def _select_keys(self, columns: str, keys: list[Key]):
+        # One IN query per (function, params_hash) group and batch of symbols
+        groups: dict[tuple[str, str], list[str]] = {}
+        for function, symbol, ph in dict.fromkeys(keys):
+            groups.setdefault((function, ph), []).append(symbol)
+        conn = self.conn()
+        for (function, ph), symbols in groups.items():
+            for i in range(0, len(symbols), _SQL_BATCH):
+                batch = symbols[i : i + _SQL_BATCH]
+                rows = conn.execute(
+                    f"SELECT symbol, {columns} FROM api_cache "
+                    "WHERE function=? AND params_hash=? "
+                    f"AND symbol IN ({','.join('?' * len(batch))})",
+                    (function, ph, *batch),
+                )
+                for symbol, *values in rows:
+                    yield (function, symbol, ph), values
+
+    def get(self, key: Key):
+        row = self.conn().execute(
+            "SELECT payload, timestamp, expires_at, content_hash FROM api_cache "
+            "WHERE function=? AND symbol=? AND params_hash=?",
+            key,
+        ).fetchone()
+        return tuple(row) if row and row[0] is not None else None
+
+    def get_many(self, keys):
+        return {
+            key: tuple(values)
+            for key, values in self._select_keys(
+                "payload, timestamp, expires_at, content_hash", keys
+            )
+            if values[0] is not None
+        }
+
+    def set_many(self, rows):
+        with self.conn() as conn:
+            conn.executemany(
+                _SQL_REPLACE,
+                (
+                    (*key, blob, ts, ts, expires, len(blob), digest)
+                    for key, blob, ts, expires, digest in rows
+                ),
+            )
+
+    def digests_many(self, keys):
+        return {key: values[0] for key, values in self._select_keys("content_hash", keys)}
+
+    def renew_many(self, rows):
+        with self.conn() as conn:
+            conn.executemany(
+                "UPDATE api_cache SET timestamp=?, expires_at=? "
+                "WHERE function=? AND symbol=? AND params_hash=?",
+                ((ts, expires, *key) for key, ts, expires in rows),
+            )
+
+    def touch_many(self, touches):
+        with self.conn() as conn:
+            conn.executemany(
+                "UPDATE api_cache SET last_access=MAX(COALESCE(last_access, 0), ?), "
+                "hit_count=COALESCE(hit_count, 0)+? "
+                "WHERE function=? AND symbol=? AND params_hash=?",
+                ((ts, hits, *key) for key, ts, hits in touches),
+            )
+
+    def metadata_many(self, keys):
+        return {
+            key: _meta(*values)
+            for key, values in self._select_keys(
+                "timestamp, expires_at, last_access, payload_size, hit_count", keys
+            )
+        }
+
+    def expiring(self, before, functions, limit):
+        sql = "SELECT function, symbol, params_hash, expires_at FROM api_cache WHERE expires_at<?"
+        args: list = [before]
+        if functions:
+            sql += f" AND function IN ({','.join('?' * len(functions))})"
+            args += functions
+        sql += " ORDER BY expires_at"
+        if limit:
+            sql += " LIMIT ?"
+            args.append(limit)
+        return [((f, s, ph), exp) for f, s, ph, exp in self.conn().execute(sql, args)]
+
+    def least_recently_used(self, limit):
+        rows = self.conn().execute(
+            "SELECT function, symbol, params_hash, last_access, payload_size FROM api_cache "
+            "ORDER BY last_access LIMIT ?",
+            (limit,),
+        )
+        return [((f, s, ph), last, size) for f, s, ph, last, size in rows]
+
+    def evict(self, max_rows, max_bytes):
+        conn = self.conn()
+        with conn:
+            conn.execute("DELETE FROM api_fetch_lease WHERE expires<?", (time.time(),))
+            rows, size = conn.execute(
+                "SELECT COUNT(*), COALESCE(SUM(payload_size), 0) FROM api_cache"
+            ).fetchone()
+            if not ((max_rows and rows > max_rows) or (max_bytes and size > max_bytes)):
+                return []
+            victims = []
+            cursor = conn.execute(
+                "SELECT rowid, function, symbol, params_hash, COALESCE(payload_size, 0) "
+                "FROM api_cache ORDER BY last_access"
+            )
+            for rowid, function, symbol, ph, length in cursor:
+                if (not max_rows or rows <= max_rows) and (
+                    not max_bytes or size <= max_bytes
+                ):
+                    break
+                victims.append((rowid, (function, symbol, ph)))
+                rows -= 1
+                size -= length
+            conn.executemany(
+                "DELETE FROM api_cache WHERE rowid=?", ((rowid,) for rowid, _ in victims)
+            )
+        return [key for _, key in victims]
+
+    def compact(self):
+        conn = self.conn()
+        freed_before = conn.execute("PRAGMA freelist_count").fetchone()[0]
+        # executescript steps the pragma to completion; execute() frees one page
+        conn.executescript(f"PRAGMA incremental_vacuum({CACHE_VACUUM_PAGES});")
+        freed_after = conn.execute("PRAGMA freelist_count").fetchone()[0]
+        return {"vacuumed_pages": freed_before - freed_after}
+
+    def acquire_lease(self, key, owner, ttl):
+        now = time.time()
+        with self.conn() as conn:
+            conn.execute(
+                "DELETE FROM api_fetch_lease WHERE function=? AND symbol=? AND params_hash=? AND expires<?",
+                (*key, now),
+            )
+            cur = conn.execute(
+                "INSERT OR IGNORE INTO api_fetch_lease (function, symbol, params_hash, owner, expires) VALUES (?, ?, ?, ?, ?)",
+                (*key, owner, now + ttl),
+            )
+            return cur.rowcount == 1
+
+    def release_lease(self, key, owner):
+        with self.conn() as conn:
+            conn.execute(
+                "DELETE FROM api_fetch_lease WHERE function=? AND symbol=? AND params_hash=? AND owner=?",
+                (*key, owner),
+            )
+
+    def stats(self):
+        conn = self.conn()
+        rows, payload_bytes = conn.execute(
+            "SELECT COUNT(*), COALESCE(SUM(payload_size), 0) FROM api_cache"
+        ).fetchone()
+        page_size = conn.execute("PRAGMA page_size").fetchone()[0]
+        pages = conn.execute("PRAGMA page_count").fetchone()[0]
+        free_pages = conn.execute("PRAGMA freelist_count").fetchone()[0]
+        wal = self.path.with_name(self.path.name + "-wal")
+        return {
+            "rows": rows,
+            "payload_bytes": payload_bytes,
+            "file_bytes": pages * page_size,
+            "free_bytes": free_pages * page_size,
+            "wal_bytes": wal.stat().st_size if wal.exists() else 0,
+        }
+
+
+def _key_bytes(key: Key) -> bytes:
+    return "\x1f".join(key).encode()
+
+
+def _key_from_bytes(raw: bytes) -> Key:
+    return tuple(bytes(raw).decode().split("\x1f"))
+
+
+class LmdbBackend(CacheBackend):
+    """Memory-mapped LMDB store in a local directory.
+
+    Entries live in one sub-database; two more hold (expires_at, key) and
+    (last_access, key) so expiry and LRU scans walk keys in order.
+    """
+
+    name = "lmdb"
+    # fetched_at, expires_at, last_access, payload_size, hit_count, digest
+    _HEADER = struct.Struct("<qqqqq16s")
+
+    def __init__(self, path: Path, map_size: int = 1 << 30):
+        if lmdb is None:
+            raise RuntimeError("CACHE_BACKEND=lmdb needs the `lmdb` package")
+        self.path = Path(path)
+        self.path.mkdir(parents=True, exist_ok=True)
+        self.env = lmdb.open(str(self.path), map_size=map_size, max_dbs=5, metasync=False)
+        self._entries = self.env.open_db(b"entries")
+        self._by_expiry = self.env.open_db(b"by_expiry")
+        self._by_access = self.env.open_db(b"by_access")
+        self._leases = self.env.open_db(b"leases")
+        self._meta = self.env.open_db(b"meta")
+
+    @staticmethod
+    def _index_key(value: int | None, kb: bytes) -> bytes:
+        # Big-endian so byte order is numeric order
+        return struct.pack(">q", value or 0) + kb
+
+    def _unpack(self, raw: bytes) -> tuple[list[int], bytes]:
+        raw = bytes(raw)
+        header = list(self._HEADER.unpack_from(raw))
+        return header, raw[self._HEADER.size :]
+
+    def _put(self, txn, kb: bytes, header: list[int], blob: bytes, old_header=None):
+        if old_header is not None:
+            txn.delete(self._index_key(old_header[1], kb), db=self._by_expiry)
+            txn.delete(self._index_key(old_header[2], kb), db=self._by_access)
+        txn.put(kb, self._HEADER.pack(*header) + blob, db=self._entries)
+        txn.put(self._index_key(header[1], kb), b"", db=self._by_expiry)
+        txn.put(self._index_key(header[2], kb), b"", db=self._by_access)
+
+    def _delete(self, txn, kb: bytes, header: list[int]):
+        txn.delete(kb, db=self._entries)
+        txn.delete(self._index_key(header[1], kb), db=self._by_expiry)
+        txn.delete(self._index_key(header[2], kb), db=self._by_access)
+        self._add_bytes(txn, -header[3])
+
+    def _add_bytes(self, txn, delta: int):
+        current = txn.get(b"payload_bytes", db=self._meta)
+        total = int(current) if current else 0
+        txn.put(b"payload_bytes", str(total + delta).encode(), db=self._meta)
+
+    def get_many(self, keys):
+        found = {}
+        with self.env.begin(db=self._entries) as txn:
+            for key in keys:
+                raw = txn.get(_key_bytes(key))
+                if raw is not None:
+                    header, blob = self._unpack(raw)
+                    found[key] = (blob, header[0], header[1], header[5].hex())
+        return found
+
+    def set_many(self, rows):
+        with self.env.begin(write=True) as txn:
+            for key, blob, ts, expires, digest in rows:
+                kb = _key_bytes(key)
+                old = txn.get(kb, db=self._entries)
+                old_header = self._unpack(old)[0] if old is not None else None
+                header = [ts, expires, ts, len(blob), 0, bytes.fromhex(digest)]
+                self._put(txn, kb, header, blob, old_header)
+                self._add_bytes(txn, len(blob) - (old_header[3] if old_header else 0))
+
+    def digests_many(self, keys):
+        found = {}
+        with self.env.begin(db=self._entries) as txn:
+            for key in keys:
+                raw = txn.get(_key_bytes(key))
+                if raw is not None:
+                    found[key] = self._unpack(raw)[0][5].hex()
+        return found
+
+    def renew_many(self, rows):
+        with self.env.begin(write=True) as txn:
+            for key, ts, expires in rows:
+                kb = _key_bytes(key)
+                raw = txn.get(kb, db=self._entries)
+                if raw is None:
+                    continue
+                header, blob = self._unpack(raw)
+                old_header = list(header)
+                header[0], header[1] = ts, expires
+                self._put(txn, kb, header, blob, old_header)
+
+    def touch_many(self, touches):
+        with self.env.begin(write=True) as txn:
+            for key, last_access, hits in touches:
+                kb = _key_bytes(key)
+                raw = txn.get(kb, db=self._entries)
+                if raw is None:
+                    continue
+                header, blob = self._unpack(raw)
+                old_header = list(header)
+                header[2] = max(header[2], last_access)
+                header[4] += hits
+                self._put(txn, kb, header, blob, old_header)
+
+    def metadata_many(self, keys):
+        found = {}
+        with self.env.begin(db=self._entries) as txn:
+            for key in keys:
+                raw = txn.get(_key_bytes(key))
+                if raw is not None:
+                    found[key] = _meta(*self._unpack(raw)[0][:5])
+        return found
+
+    def expiring(self, before, functions, limit):
+        found = []
+        with self.env.begin(db=self._by_expiry) as txn:
+            for ik, _ in txn.cursor():
+                expires = struct.unpack(">q", ik[:8])[0]
+                if expires >= before or (limit and len(found) >= limit):
+                    break
+                key = _key_from_bytes(ik[8:])
+                if not functions or key[0] in functions:
+                    found.append((key, expires))
+        return found
+
+    def least_recently_used(self, limit):
+        found = []
+        with self.env.begin() as txn:
+            for ik, _ in txn.cursor(db=self._by_access):
+                if len(found) >= limit:
+                    break
+                raw = txn.get(ik[8:], db=self._entries)
+                if raw is not None:
+                    header = self._unpack(raw)[0]
+                    found.append((_key_from_bytes(ik[8:]), header[2], header[3]))
+        return found
+
+    def evict(self, max_rows, max_bytes):
+        evicted = []
+        with self.env.begin(write=True) as txn:
+            rows = txn.stat(self._entries)["entries"]
+            size = int(txn.get(b"payload_bytes", db=self._meta) or 0)
+            victims = []
+            for ik, _ in txn.cursor(db=self._by_access):
+                if (not max_rows or rows <= max_rows) and (
+                    not max_bytes or size <= max_bytes
+                ):
+                    break
+                victims.append(bytes(ik[8:]))
+                rows -= 1
+                size -= self._unpack(txn.get(ik[8:], db=self._entries))[0][3]
+            for kb in victims:
+                self._delete(txn, kb, self._unpack(txn.get(kb, db=self._entries))[0])
+                evicted.append(_key_from_bytes(kb))
+            now = time.time()
+            expired = [
+                bytes(k)
+                for k, v in txn.cursor(db=self._leases)
+                if float(bytes(v).split(b"\0")[1]) < now
+            ]
+            for lk in expired:
+                txn.delete(lk, db=self._leases)
+        return evicted
+
+    def acquire_lease(self, key, owner, ttl):
+        kb = _key_bytes(key)
+        now = time.time()
+        with self.env.begin(write=True, db=self._leases) as txn:
+            current = txn.get(kb)
+            if current is not None and float(bytes(current).split(b"\0")[1]) >= now:
+                return False
+            txn.put(kb, owner.encode() + b"\0" + str(now + ttl).encode())
+            return True
+
+    def release_lease(self, key, owner):
+        kb = _key_bytes(key)
+        with self.env.begin(write=True, db=self._leases) as txn:
+            current = txn.get(kb)
+            if current is not None and bytes(current).split(b"\0")[0] == owner.encode():
+                txn.delete(kb)
+
+    def stats(self):
+        info = self.env.info()
+        with self.env.begin() as txn:
+            rows = txn.stat(self._entries)["entries"]
+            payload_bytes = int(txn.get(b"payload_bytes", db=self._meta) or 0)
+        return {
+            "rows": rows,
+            "payload_bytes": payload_bytes,
+            "map_size": info["map_size"],
+            "used_bytes": (info["last_pgno"] + 1) * self.env.stat()["psize"],
+        }
+
+
+def _watch_error(client) -> type[Exception]:
+    """WatchError from the library the client is built on (redis-py, or a
+    compatible fork), so injected clients work without importing `redis`."""
+    for cls in type(client).__mro__:
+        package = sys.modules.get(cls.__module__.split(".")[0])
+        error = getattr(package, "WatchError", None)
+        if isinstance(error, type) and issubclass(error, Exception):
+            return error
+    raise RuntimeError(f"{type(client).__name__} does not support WATCH")
+
+
+class RedisBackend(CacheBackend):
+    """Shared cache on a Redis-protocol server, so replicas reuse one warm cache.
+
+    Each entry is a hash; sorted sets index it by expiry and last access, and
+    fetch leases are plain SET NX keys with a TTL. Pass `client` to run
+    against any redis-py compatible object, e.g. a fakeredis stand-in.
+    """
+
+    name = "redis"
+    _BATCH = 200
+
+    def __init__(self, client=None, url: str | None = None, prefix: str = "vendor_cache:"):
+        if client is None:
+            if redis is None:
+                raise RuntimeError("CACHE_BACKEND=redis needs the `redis` package")
+            client = redis.Redis.from_url(url or "redis://localhost:6379/0")
+        self.r = client
+        self._watch_error = _watch_error(client)
+        self.prefix = prefix
+        self._expiry = prefix + "by_expiry"
+        self._access = prefix + "by_access"
+        self._bytes = prefix + "payload_bytes"
+
+    def _entry(self, member: str) -> str:
+        return self.prefix + "e:" + member
+
+    @staticmethod
+    def _member(key: Key) -> str:
+        return "\x1f".join(key)
+
+    def get_many(self, keys):
+        keys = list(dict.fromkeys(keys))
+        pipe = self.r.pipeline(transaction=False)
+        for key in keys:
+            pipe.hmget(
+                self._entry(self._member(key)), "payload", "ts", "expires", "digest"
+            )
+        found = {}
+        for key, (blob, ts, expires, digest) in zip(keys, pipe.execute()):
+            if blob is not None:
+                found[key] = (
+                    blob,
+                    int(ts),
+                    int(expires) if expires else None,
+                    self._key_str(digest) if digest else None,
+                )
+        return found
+
+    def _sizes(self, members: list[str]) -> list:
+        pipe = self.r.pipeline(transaction=False)
+        for member in members:
+            pipe.hget(self._entry(member), "size")
+        return pipe.execute()
+
+    def _transaction(self, members: list[str], queue):
+        """Run queue(pipe, sizes) as one MULTI/EXEC over the given entries.
+
+        The entries are WATCHed before their sizes are read, so if another
+        replica writes one of them in between, EXEC aborts and the whole
+        read-and-write is retried rather than applying a stale size delta.
+        """
+        while True:
+            with self.r.pipeline() as pipe:
+                try:
+                    pipe.watch(*(self._entry(m) for m in members))
+                    sizes = self._sizes(members)
+                    pipe.multi()
+                    result = queue(pipe, sizes)
+                    pipe.execute()
+                    return result
+                except self._watch_error:
+                    continue
+
+    def set_many(self, rows):
+        # Last row per key wins, so each old size is subtracted once
+        rows = list({key: (key, *rest) for key, *rest in rows}.values())
+        members = [self._member(key) for key, *_ in rows]
+        if not members:
+            return
+
+        def queue(pipe, old_sizes):
+            delta = 0
+            for member, old, (_, blob, ts, expires, digest) in zip(
+                members, old_sizes, rows
+            ):
+                pipe.hset(
+                    self._entry(member),
+                    mapping={
+                        "payload": blob,
+                        "ts": ts,
+                        "expires": expires,
+                        "last_access": ts,
+                        "size": len(blob),
+                        "hits": 0,
+                        "digest": digest,
+                    },
+                )
+                pipe.zadd(self._expiry, {member: expires})
+                pipe.zadd(self._access, {member: ts})
+                delta += len(blob) - int(old or 0)
+            pipe.incrby(self._bytes, delta)
+
+        self._transaction(members, queue)
+
+    def digests_many(self, keys):
+        keys = list(dict.fromkeys(keys))
+        pipe = self.r.pipeline(transaction=False)
+        for key in keys:
+            pipe.hmget(self._entry(self._member(key)), "ts", "digest")
+        return {
+            key: self._key_str(digest) if digest else None
+            for key, (ts, digest) in zip(keys, pipe.execute())
+            if ts is not None
+        }
+
+    def renew_many(self, rows):
+        members = [self._member(key) for key, *_ in rows]
+        if not members:
+            return
+
+        # Inside the transaction, so an entry evicted meanwhile is not
+        # recreated as a hash without its payload
+        def queue(pipe, sizes):
+            for member, size, (_, ts, expires) in zip(members, sizes, rows):
+                if size is None:
+                    continue
+                pipe.hset(self._entry(member), mapping={"ts": ts, "expires": expires})
+                pipe.zadd(self._expiry, {member: expires})
+
+        self._transaction(members, queue)
+
+    def touch_many(self, touches):
+        members = [self._member(key) for key, *_ in touches]
+        if not members:
+            return
+
+        def queue(pipe, sizes):
+            for member, size, (_, last_access, hits) in zip(members, sizes, touches):
+                if size is None:
+                    continue
+                pipe.hset(self._entry(member), "last_access", last_access)
+                pipe.hincrby(self._entry(member), "hits", hits)
+                pipe.zadd(self._access, {member: last_access})
+
+        self._transaction(members, queue)
+
+    def metadata_many(self, keys):
+        keys = list(dict.fromkeys(keys))
+        pipe = self.r.pipeline(transaction=False)
+        for key in keys:
+            pipe.hmget(
+                self._entry(self._member(key)), "ts", "expires", "last_access", "size", "hits"
+            )
+        return {
+            key: _meta(*(int(v) if v is not None else None for v in values))
+            for key, values in zip(keys, pipe.execute())
+            if values[0] is not None
+        }
+
+    @staticmethod
+    def _key(member) -> Key:
+        if isinstance(member, bytes):
+            member = member.decode()
+        return tuple(member.split("\x1f"))
+
+    def expiring(self, before, functions, limit):
+        # Filtering by function happens client-side, so only page when unfiltered
+        page = None if functions else limit
+        members = self.r.zrangebyscore(
+            self._expiry, "-inf", f"({before}", start=0 if page else None, num=page, withscores=True
+        )
+        found = [
+            (key, int(score))
+            for key, score in ((self._key(m), s) for m, s in members)
+            if not functions or key[0] in functions
+        ]
+        return found[:limit] if limit else found
+
+    def least_recently_used(self, limit):
+        members = self.r.zrange(self._access, 0, limit - 1, withscores=True)
+        keys = [self._key(m) for m, _ in members]
+        meta = self.metadata_many(keys)
+        return [
+            (key, int(score), meta[key]["payload_size"])
+            for key, (_, score) in zip(keys, members)
+            if key in meta
+        ]
+
+    def evict(self, max_rows, max_bytes):
+        rows = self.r.zcard(self._access)
+        size = int(self.r.get(self._bytes) or 0)
+        evicted = []
+        while ((max_rows and rows > max_rows) or (max_bytes and size > max_bytes)) and rows:
+            members = [
+                self._key_str(m) for m in self.r.zrange(self._access, 0, self._BATCH - 1)
+            ]
+            if not members:
+                break
+
+            def queue(pipe, sizes, rows=rows, size=size):
+                batch, freed = [], 0
+                for member, length in zip(members, sizes):
+                    if (not max_rows or rows <= max_rows) and (
+                        not max_bytes or size <= max_bytes
+                    ):
+                        break
+                    pipe.delete(self._entry(member))
+                    pipe.zrem(self._expiry, member)
+                    pipe.zrem(self._access, member)
+                    length = int(length or 0)
+                    freed += length
+                    rows -= 1
+                    size -= length
+                    batch.append(self._key(member))
+                pipe.decrby(self._bytes, freed)
+                return batch, freed
+
+            batch, freed = self._transaction(members, queue)
+            evicted += batch
+            rows -= len(batch)
+            size -= freed
+        return evicted
+
+    @staticmethod
+    def _key_str(member) -> str:
+        return member.decode() if isinstance(member, bytes) else member
+
+    def _lease(self, key: Key) -> str:
+        return self.prefix + "lease:" + self._member(key)
+
+    def acquire_lease(self, key, owner, ttl):
+        return bool(self.r.set(self._lease(key), owner, nx=True, px=int(ttl * 1000)))
+
+    def release_lease(self, key, owner):
+        lease = self._lease(key)
+        # Compare-and-delete, so an expired lease re-taken by someone else survives
+        with self.r.pipeline() as pipe:
+            try:
+                pipe.watch(lease)
+                current = pipe.get(lease)
+                if current is not None and self._key_str(current) == owner:
+                    pipe.multi()
+                    pipe.delete(lease)
+                    pipe.execute()
+            except self._watch_error:
+                # Changed under us, so it is no longer ours to delete
+                pass
+
+    def stats(self):
+        return {
+            "rows": self.r.zcard(self._access),
+            "payload_bytes": int(self.r.get(self._bytes) or 0),
+        }
@@ -1,46 +1,214 @@
 import os
-import json
+import logging
 import time
-import sqlite3
+import random
+import weakref
+import asyncio
+import socket
+import itertools
+import threading
+import httpx
 import requests
+from collections import OrderedDict
+from concurrent.futures import Future, ThreadPoolExecutor
+from dataclasses import dataclass
+from datetime import date, datetime, time as dtime, timedelta
 from pathlib import Path
 from dotenv import load_dotenv
 from requests.adapters import HTTPAdapter
 from urllib3.util.retry import Retry
+from zoneinfo import ZoneInfo
+from cache_backends import (
+    CacheBackend,
+    LmdbBackend,
+    RedisBackend,
+    SqliteBackend,
+    decode_payload,
+    encode_payload,
+    payload_digest,
+)
+from fixtures import FixtureProvider
+from parsers import IncomeStatement, parse_income_statement, parse_overview
 
 load_dotenv()
+logger = logging.getLogger(__name__)
 API_KEY = os.getenv("ALPHAVANTAGE_KEY")
-BASE_URL = "https://www.alphavantage.co/query"
+# Point at a local stand-in (standin_server.py) for benchmarks and tests
+BASE_URL = os.getenv("ALPHAVANTAGE_BASE_URL", "https://www.alphavantage.co/query")
+# alphavantage, or fixtures for synthetic offline payloads (see fixtures.py)
+DATA_PROVIDER = os.getenv("DATA_PROVIDER", "alphavantage")
 CACHE_DIR = Path(os.getenv("CACHE_DIR", "/tmp/vendor_cache"))
 CACHE_DIR.mkdir(parents=True, exist_ok=True)
 CACHE_DB = CACHE_DIR / "vendor_cache.sqlite"
-TTL_BY_FUNCTION = {
-    "OVERVIEW": 24 * 3600,  # 24h
-    "INCOME_STATEMENT": 24 * 3600,  # 24h
-}
+FETCH_MAX_WORKERS = int(os.getenv("FETCH_MAX_WORKERS", "8"))
+ASYNC_MAX_CONNECTIONS = int(os.getenv("ASYNC_MAX_CONNECTIONS", "20"))
+REQUEST_TIMEOUT = 30
+RETRY_TOTAL = 3
+RETRY_BACKOFF_FACTOR = 1  # 1s, 2s, 4s
+RETRY_STATUSES = [429, 500, 502, 503, 504]
+# Client-side quota; 0 disables a window
+RATE_LIMIT_PER_MINUTE = float(os.getenv("ALPHAVANTAGE_RPM", "5"))
+RATE_LIMIT_PER_DAY = float(os.getenv("ALPHAVANTAGE_RPD", "25"))
+RATE_LIMIT_MAX_WAIT = float(os.getenv("RATE_LIMIT_MAX_WAIT", "60"))
+# Cross-process fetch lease; must outlast a full rate-limit wait plus retries
+FETCH_LEASE_SECONDS = float(
+    os.getenv(
+        "FETCH_LEASE_SECONDS",
+        RATE_LIMIT_MAX_WAIT + REQUEST_TIMEOUT * (RETRY_TOTAL + 1) + 10,
+    )
+)
+FETCH_LEASE_POLL = 0.25
+# Stale-while-revalidate: serve expired entries up to MAX_STALENESS seconds
+# past their TTL immediately and refresh them in the background
+STALE_WHILE_REVALIDATE = os.getenv("STALE_WHILE_REVALIDATE", "0") == "1"
+MAX_STALENESS = int(os.getenv("MAX_STALENESS", str(7 * 24 * 3600)))
+REFRESH_WORKERS = int(os.getenv("REFRESH_WORKERS", "2"))
+# In-process tier in front of the cache backend; the TTL bounds how long a write made by
+# another process can go unseen
+MEMORY_CACHE_SIZE = int(os.getenv("MEMORY_CACHE_SIZE", "1024"))
+MEMORY_CACHE_TTL = int(os.getenv("MEMORY_CACHE_TTL", "300"))
+# Where api_cache lives: sqlite (CACHE_DB), lmdb (a directory under
+# CACHE_DIR) or redis (CACHE_REDIS_URL, shared between hosts)
+CACHE_BACKEND = os.getenv("CACHE_BACKEND", "sqlite")
+CACHE_REDIS_URL = os.getenv("CACHE_REDIS_URL", "redis://localhost:6379/0")
+CACHE_LMDB_MAP_SIZE = int(os.getenv("CACHE_LMDB_MAP_SIZE", str(1024 * 1024 * 1024)))
+# Size budget for api_cache, enforced least-recently-accessed first; 0 = no limit
+CACHE_MAX_ROWS = int(os.getenv("CACHE_MAX_ROWS", "0"))
+CACHE_MAX_BYTES = int(os.getenv("CACHE_MAX_BYTES", str(256 * 1024 * 1024)))
+# Spread expiries by up to this fraction of the TTL so they don't all land together
+TTL_JITTER = float(os.getenv("TTL_JITTER", "0.1"))
+# Days after a quarter ends before its figures are expected to be published
+EARNINGS_REPORT_LAG_DAYS = int(os.getenv("EARNINGS_REPORT_LAG_DAYS", "20"))
+MARKET_TZ = ZoneInfo("America/New_York")
+MARKET_CLOSE = dtime(16, 0)
+# Alpha Vantage end-of-day figures show up a while after the close
+MARKET_SETTLE = timedelta(hours=2)
 
 
-def _get_conn():
-    return sqlite3.connect(str(CACHE_DB), check_same_thread=False)
+class MarketCalendar:
+    """US equity trading days: weekdays minus the given holidays."""
 
+    def __init__(self, holidays: set[date] = frozenset()):
+        self.holidays = set(holidays)
 
-def _init_cache():
-    with _get_conn() as conn:
-        conn.execute(
-            """
-            CREATE TABLE IF NOT EXISTS api_cache (
-                function TEXT,
-                symbol   TEXT,
-                params_hash TEXT,
-                response TEXT,
-                timestamp INTEGER,
-                PRIMARY KEY (function, symbol, params_hash)
-            )
-        """
-        )
+    def is_trading_day(self, day: date) -> bool:
+        return day.weekday() < 5 and day not in self.holidays
+
+    def next_update(self, ts: float) -> float:
+        """First time at or after ts when a new trading session's figures exist."""
+        now = datetime.fromtimestamp(ts, MARKET_TZ)
+        day = now.date()
+        while True:
+            if self.is_trading_day(day):
+                published = datetime.combine(day, MARKET_CLOSE, MARKET_TZ) + MARKET_SETTLE
+                if published >= now:
+                    return published.timestamp()
+            day += timedelta(days=1)
+
+
+class TtlPolicy:
+    """Decides when a cache entry expires.
+
+    The base TTL comes from the symbol's group, then the function, then the
+    default. It is then pushed out to the next point where the data can have
+    changed: the next expected quarterly report for statement functions, or
+    the next session close for market-driven ones. Jitter spreads expiries
+    so that entries fetched together don't expire together.
+    """
+
+    def __init__(
+        self,
+        function_ttls: dict[str, int],
+        default_ttl: int = 24 * 3600,
+        symbol_groups: dict[str, str] | None = None,
+        group_ttls: dict[str, dict[str, int]] | None = None,
+        market_functions: set[str] = frozenset(),
+        quarterly_functions: set[str] = frozenset(),
+        calendar: MarketCalendar | None = None,
+        jitter: float = TTL_JITTER,
+        report_lag_days: int = EARNINGS_REPORT_LAG_DAYS,
+    ):
+        self.function_ttls = dict(function_ttls)
+        self.default_ttl = default_ttl
+        self.symbol_groups = dict(symbol_groups or {})
+        self.group_ttls = dict(group_ttls or {})
+        self.market_functions = set(market_functions)
+        self.quarterly_functions = set(quarterly_functions)
+        self.calendar = calendar or MarketCalendar()
+        self.jitter = jitter
+        self.report_lag = timedelta(days=report_lag_days)
+
+    def ttl(self, function: str, symbol: str | None = None) -> int:
+        """Base TTL in seconds, before calendar rules and jitter."""
+        group = self.group_ttls.get(self.symbol_groups.get(symbol), {})
+        return group.get(function, self.function_ttls.get(function, self.default_ttl))
+
+    def _next_report(self, payload: dict) -> float | None:
+        ends = []
+        for report in payload.get("quarterlyReports") or ():
+            end = report.get("fiscalDateEnding") if isinstance(report, dict) else None
+            if not isinstance(end, str):
+                continue
+            try:
+                ends.append(date.fromisoformat(end))
+            except ValueError:
+                continue
+        if not ends:
+            return None
+        # Next quarter closes ~91 days later and is filed some weeks after that
+        expected = max(ends) + timedelta(days=91) + self.report_lag
+        return datetime.combine(expected, dtime(0), MARKET_TZ).timestamp()
+
+    def not_before(
+        self, function: str, payload: dict | None, fetched_at: float
+    ) -> float | None:
+        """The next point where data fetched at fetched_at can have changed,
+        or None when the function has no calendar rule. Refreshing earlier
+        spends a call on unchanged data."""
+        if function in self.quarterly_functions:
+            return self._next_report(payload) if payload else None
+        if function in self.market_functions:
+            return self.calendar.next_update(fetched_at)
+        return None
+
+    def expires_at(
+        self, function: str, symbol: str, payload: dict | None, fetched_at: int
+    ) -> int:
+        base = self.ttl(function, symbol)
+        expires = fetched_at + base * (1 + random.uniform(-self.jitter, self.jitter))
+
+        unchanged_until = self.not_before(function, payload, fetched_at)
+        if unchanged_until is not None and unchanged_until > expires:
+            expires = unchanged_until + random.uniform(0, self.jitter) * base
+        return int(expires)
+
+
+TTL_POLICY = TtlPolicy(
+    function_ttls={
+        "OVERVIEW": 24 * 3600,  # 24h
+        "INCOME_STATEMENT": 24 * 3600,  # 24h, but not before the next report
+        "TIME_SERIES_DAILY_ADJUSTED": 24 * 3600,  # until the next close settles
+    },
+    market_functions={"OVERVIEW", "TIME_SERIES_DAILY_ADJUSTED"},
+    quarterly_functions={"INCOME_STATEMENT"},
+)
 
 
-_init_cache()
+def ttl_for(function: str, symbol: str | None = None) -> int:
+    return TTL_POLICY.ttl(function, symbol)
+
+
+def _make_backend(name: str) -> CacheBackend:
+    if name == "sqlite":
+        return SqliteBackend(CACHE_DB, default_ttl=ttl_for)
+    if name == "lmdb":
+        return LmdbBackend(CACHE_DIR / "vendor_cache.lmdb", map_size=CACHE_LMDB_MAP_SIZE)
+    if name == "redis":
+        return RedisBackend(url=CACHE_REDIS_URL)
+    raise ValueError(f"Unknown CACHE_BACKEND {name!r}")
+
+
+CACHE = _make_backend(CACHE_BACKEND)
 
 
 def _params_hash(params: dict) -> str:
@@ -48,37 +216,331 @@ def _params_hash(params: dict) -> str:
     return "|".join(f"{k}={v}" for k, v in items) if items else "_"
 
 
-def cache_get(function: str, symbol: str, params_extra: dict | None) -> dict | None:
+class MemoryCache:
+    """Bounded LRU with a per-entry TTL, keyed by any hashable tuple.
+
+    MEMORY_CACHE holds decoded cache entries by (function, symbol,
+    params_hash); the same class backs the parsed-record and figure caches.
+    Values are shared between callers and must be treated as read-only.
+    """
+
+    def __init__(self, max_entries: int, ttl: float):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self._entries: OrderedDict[tuple, tuple[float, object]] = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, key: tuple):
+        with self._lock:
+            item = self._entries.get(key)
+            if item is None or item[0] <= time.monotonic():
+                if item is not None:
+                    del self._entries[key]
+                    self.evictions += 1
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return item[1]
+
+    def put(self, key: tuple, entry):
+        if self.max_entries <= 0:
+            return
+        with self._lock:
+            self._entries[key] = (time.monotonic() + self.ttl, entry)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def invalidate(self, key: tuple):
+        with self._lock:
+            self._entries.pop(key, None)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "entries": len(self._entries),
+                "max_entries": self.max_entries,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+            }
+
+
+MEMORY_CACHE = MemoryCache(MEMORY_CACHE_SIZE, MEMORY_CACHE_TTL)
+
+# Reads record their access time and hit count here and the backend is
+# updated in batches, so a cache hit never has to write to the store itself
+_PENDING_TOUCHES: dict[tuple, list[int]] = {}
+_TOUCH_LOCK = threading.Lock()
+_TOUCH_FLUSH_AT = 256
+
+
+def _record_touch(key: tuple) -> bool:
+    """Queue an access to key; True when the batch is due to be flushed."""
+    with _TOUCH_LOCK:
+        touch = _PENDING_TOUCHES.setdefault(key, [0, 0])
+        touch[0] = int(time.time())
+        touch[1] += 1
+        return len(_PENDING_TOUCHES) >= _TOUCH_FLUSH_AT
+
+
+def _touch(key: tuple):
+    if _record_touch(key):
+        _flush_touches()
+
+
+def _flush_touches():
+    with _TOUCH_LOCK:
+        touches = list(_PENDING_TOUCHES.items())
+        _PENDING_TOUCHES.clear()
+    if not touches:
+        return
+    CACHE.touch_many([(key, ts, hits) for key, (ts, hits) in touches])
+
+
+def cache_get(
+    function: str, symbol: str, params_extra: dict | None, use_memory: bool = True
+) -> dict | None:
     ph = _params_hash(params_extra or {})
-    with _get_conn() as conn:
-        row = conn.execute(
-            "SELECT response, timestamp FROM api_cache WHERE function=? AND symbol=? AND params_hash=?",
-            (function, symbol, ph),
-        ).fetchone()
-    if not row:
+    key = (function, symbol, ph)
+    if use_memory:
+        entry = MEMORY_CACHE.get(key)
+        if entry is not None:
+            _touch(key)
+            return entry
+
+    row = CACHE.get(key)
+    if row is None:
         return None
-    response_text, ts = row
-    try:
-        return {"data": json.loads(response_text), "ts": ts}
-    except json.JSONDecodeError:
+    blob, ts, expires, digest = row
+    data = decode_payload(blob)
+    if data is None:
         return None
+    entry = {"data": data, "ts": ts, "expires": expires, "digest": digest}
+    MEMORY_CACHE.put(key, entry)
+    _touch(key)
+    return entry
+
+
+# listener(function, symbol, params_hash, entry) runs after a write whose
+# payload differs from the cached one; unchanged refreshes stay silent
+_CHANGE_LISTENERS: list = []
+_UNCHANGED_WRITES = 0
+
+
+def subscribe_cache_changes(listener):
+    """Call listener for every cache entry whose content changes."""
+    _CHANGE_LISTENERS.append(listener)
+    return listener
+
+
+def unsubscribe_cache_changes(listener):
+    if listener in _CHANGE_LISTENERS:
+        _CHANGE_LISTENERS.remove(listener)
+
+
+def _publish_change(key: tuple, entry: dict):
+    for listener in list(_CHANGE_LISTENERS):
+        try:
+            listener(*key, entry)
+        except Exception:
+            logger.exception("Cache change listener %r failed", listener)
+
 
+def _write_entries(
+    function: str, payloads: dict[str, dict], ph: str
+) -> dict[str, dict]:
+    """Store payloads and return their entries by symbol.
 
-def cache_set(function: str, symbol: str, params_extra: dict | None, payload: dict):
+    A payload whose digest matches the stored one is not rewritten; only its
+    fetch time and expiry move forward, and no change is published.
+    """
+    global _UNCHANGED_WRITES
+    ts = int(time.time())
+    keys = {symbol: (function, symbol, ph) for symbol in payloads}
+    stored = CACHE.digests_many(list(keys.values()))
+    entries, changed, renewed = {}, [], []
+    for symbol, payload in payloads.items():
+        key = keys[symbol]
+        digest = payload_digest(payload)
+        expires = TTL_POLICY.expires_at(function, symbol, payload, ts)
+        entries[symbol] = {
+            "data": payload,
+            "ts": ts,
+            "expires": expires,
+            "digest": digest,
+        }
+        if stored.get(key) == digest:
+            renewed.append((key, ts, expires))
+        else:
+            changed.append((key, encode_payload(payload), ts, expires, digest))
+    if changed:
+        CACHE.set_many(changed)
+    if renewed:
+        CACHE.renew_many(renewed)
+        _UNCHANGED_WRITES += len(renewed)
+    for symbol, entry in entries.items():
+        MEMORY_CACHE.put(keys[symbol], entry)
+    for key, *_ in changed:
+        _publish_change(key, entries[key[1]])
+    return entries
+
+
+def cache_set(
+    function: str, symbol: str, params_extra: dict | None, payload: dict
+) -> dict:
+    """Store payload and return the cached entry
+    ({"data", "ts", "expires", "digest"})."""
     ph = _params_hash(params_extra or {})
-    with _get_conn() as conn:
-        conn.execute(
-            "REPLACE INTO api_cache (function, symbol, params_hash, response, timestamp) VALUES (?, ?, ?, ?, ?)",
-            (function, symbol, ph, json.dumps(payload), int(time.time())),
-        )
+    return _write_entries(function, {symbol: payload}, ph)[symbol]
+
+
+def cache_get_many(
+    function: str,
+    symbols: list[str],
+    params_extra: dict | None = None,
+    use_memory: bool = True,
+) -> dict[str, dict]:
+    """cache_get for many symbols; returns {symbol: entry} for the hits only.
+
+    Memory misses are resolved with one backend round trip.
+    """
+    ph = _params_hash(params_extra or {})
+    found: dict[str, dict] = {}
+    missing = []
+    for symbol in dict.fromkeys(symbols):
+        key = (function, symbol, ph)
+        entry = MEMORY_CACHE.get(key) if use_memory else None
+        if entry is not None:
+            found[symbol] = entry
+            _touch(key)
+        else:
+            missing.append(key)
+
+    for key, (blob, ts, expires, digest) in CACHE.get_many(missing).items():
+        data = decode_payload(blob)
+        if data is None:
+            continue
+        found[key[1]] = entry = {
+            "data": data,
+            "ts": ts,
+            "expires": expires,
+            "digest": digest,
+        }
+        MEMORY_CACHE.put(key, entry)
+        _touch(key)
+    return found
+
+
+def cache_metadata(
+    function: str, symbols: list[str], params_extra: dict | None = None
+) -> dict[str, dict]:
+    """Bookkeeping for the given symbols, without loading payloads."""
+    ph = _params_hash(params_extra or {})
+    found = CACHE.metadata_many([(function, symbol, ph) for symbol in symbols])
+    return {key[1]: meta for key, meta in found.items()}
+
+
+def cache_digests(
+    function: str, symbols: list[str], params_extra: dict | None = None
+) -> dict[str, str]:
+    """Stored payload digest per cached symbol, without loading payloads."""
+    ph = _params_hash(params_extra or {})
+    found = CACHE.digests_many([(function, symbol, ph) for symbol in symbols])
+    return {key[1]: digest for key, digest in found.items() if digest}
+
+
+def cache_expiring(
+    within: int, functions: list[str] | None = None, limit: int | None = None
+) -> list[dict]:
+    """Entries whose TTL runs out in the next `within` seconds (or already
+    has), soonest first. Served from the backend's expiry index."""
+    rows = CACHE.expiring(int(time.time()) + within, functions, limit)
+    return [
+        {"function": f, "symbol": s, "params_hash": ph, "expires_at": exp}
+        for (f, s, ph), exp in rows
+    ]
+
+
+def cache_least_recently_used(limit: int) -> list[dict]:
+    """The `limit` least recently accessed entries, oldest access first."""
+    _flush_touches()
+    return [
+        {
+            "function": f,
+            "symbol": s,
+            "params_hash": ph,
+            "last_access": last,
+            "payload_size": size,
+        }
+        for (f, s, ph), last, size in CACHE.least_recently_used(limit)
+    ]
+
+
+_CACHE_EVICTIONS = 0
+_LAST_MAINTENANCE: dict = {}
+
+
+def run_cache_maintenance(
+    max_rows: int | None = None, max_bytes: int | None = None
+) -> dict:
+    """Enforce the cache size budget and give freed space back to the filesystem.
+
+    Least recently accessed entries are evicted first until both the row and
+    the payload-byte budget hold. Returns cache_stats() plus this run's counts.
+    """
+    global _CACHE_EVICTIONS
+    max_rows = CACHE_MAX_ROWS if max_rows is None else max_rows
+    max_bytes = CACHE_MAX_BYTES if max_bytes is None else max_bytes
+    started = time.time()
+    _flush_touches()
+
+    evicted = CACHE.evict(max_rows, max_bytes)
+    for key in evicted:
+        MEMORY_CACHE.invalidate(key)
+    _CACHE_EVICTIONS += len(evicted)
+    compacted = CACHE.compact()
+
+    _LAST_MAINTENANCE.clear()
+    _LAST_MAINTENANCE.update(
+        at=started,
+        duration=time.time() - started,
+        evicted=len(evicted),
+        **compacted,
+    )
+    return cache_stats()
+
+
+def cache_stats() -> dict:
+    """Size and eviction counters for the cache backend and the memory tier."""
+    return {
+        "backend": CACHE.name,
+        **CACHE.stats(),
+        "max_rows": CACHE_MAX_ROWS,
+        "max_bytes": CACHE_MAX_BYTES,
+        "evictions": _CACHE_EVICTIONS,
+        "unchanged_writes": _UNCHANGED_WRITES,
+        "provider": FIXTURES.stats() if FIXTURES is not None else DATA_PROVIDER,
+        "last_maintenance": dict(_LAST_MAINTENANCE),
+        "memory": MEMORY_CACHE.stats(),
+    }
 
 
 def _build_session() -> requests.Session:
     session = requests.Session()
     retry = Retry(
-        total=3,
-        backoff_factor=1,  # 1s, 2s, 4s
-        status_forcelist=[429, 500, 502, 503, 504],
+        total=RETRY_TOTAL,
+        backoff_factor=RETRY_BACKOFF_FACTOR,
+        status_forcelist=RETRY_STATUSES,
         allowed_methods=["GET"],
     )
     adapter = HTTPAdapter(max_retries=retry)
@@ -90,48 +552,647 @@ def _build_session() -> requests.Session:
 SESSION = _build_session()
 
 
+class RateLimitExceeded(RuntimeError):
+    """Raised when the next free request slot is further away than the caller will wait."""
+
+    def __init__(self, retry_after: float):
+        super().__init__(f"Client-side rate limit reached, next slot in {retry_after:.1f}s")
+        self.retry_after = retry_after
+
+
+class RateLimiter:
+    """Token buckets for the per-minute and per-day quotas, shared by all threads.
+
+    Slots are handed out in call order: a caller that cannot be served now
+    reserves the next free slot (the bucket goes into debt) and sleeps until
+    it opens, so queued fetches never race each other for the same token.
+    """
+
+    def __init__(self, per_minute: float = 0, per_day: float = 0):
+        # [capacity, tokens, refill per second]
+        self._buckets = [
+            [limit, limit, limit / window]
+            for limit, window in ((per_minute, 60), (per_day, 86400))
+            if limit > 0
+        ]
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def _refill(self):
+        now = time.monotonic()
+        elapsed = now - self._updated
+        self._updated = now
+        for bucket in self._buckets:
+            bucket[1] = min(bucket[0], bucket[1] + elapsed * bucket[2])
+
+    def _wait_locked(self) -> float:
+        return max((max(0.0, (1 - t) / r) for _, t, r in self._buckets), default=0.0)
+
+    def wait_time(self) -> float:
+        """Seconds until a slot would be free, without taking it."""
+        with self._lock:
+            self._refill()
+            return self._wait_locked()
+
+    def reserve(self, max_wait: float | None = None) -> float:
+        """Claim the next slot and return how long to sleep before using it.
+
+        Raises RateLimitExceeded (without claiming) if that is beyond max_wait.
+        """
+        with self._lock:
+            self._refill()
+            wait = self._wait_locked()
+            if max_wait is not None and wait > max_wait:
+                raise RateLimitExceeded(wait)
+            for bucket in self._buckets:
+                bucket[1] -= 1
+            return wait
+
+    def acquire(self, max_wait: float | None = RATE_LIMIT_MAX_WAIT):
+        wait = self.reserve(max_wait)
+        if wait > 0:
+            time.sleep(wait)
+
+    async def acquire_async(self, max_wait: float | None = RATE_LIMIT_MAX_WAIT):
+        wait = self.reserve(max_wait)
+        if wait > 0:
+            await asyncio.sleep(wait)
+
+
+RATE_LIMITER = RateLimiter(RATE_LIMIT_PER_MINUTE, RATE_LIMIT_PER_DAY)
+
+
 def _is_limit_or_error(payload: dict) -> bool:
     # Handles Limit errors
     return any(k in payload for k in ["Information", "Note", "Error Message"])
 
 
-def _cached_api_call(
+class AlphaVantageError(RuntimeError):
+    """Alpha Vantage answered with a rate-limit notice or an error message."""
+
+
+# Failures for which an expired cache entry may be served instead
+_STALE_FALLBACK_ERRORS = (AlphaVantageError, RateLimitExceeded)
+
+
+@dataclass(frozen=True)
+class CacheResult:
+    """A payload plus where it came from.
+
+    fetched_at is when the payload was retrieved upstream. stale is True when
+    it is past its TTL, and revalidating when a background refresh was
+    scheduled for it. digest identifies the payload's content.
+    """
+
+    data: dict
+    fetched_at: int
+    stale: bool = False
+    revalidating: bool = False
+    digest: str | None = None
+
+
+def _result(entry: dict, **flags) -> CacheResult:
+    return CacheResult(entry["data"], entry["ts"], digest=entry.get("digest"), **flags)
+
+
+def _expires(function: str, cached: dict) -> int:
+    # Entries without a stored expiry fall back to the base TTL
+    return cached.get("expires") or cached["ts"] + ttl_for(function)
+
+
+def _is_fresh(function: str, cached: dict | None, newer_than: int | None = None) -> bool:
+    if not cached or (newer_than is not None and cached["ts"] < newer_than):
+        return False
+    return int(time.time()) < _expires(function, cached)
+
+
+def _within_max_staleness(
+    function: str, cached: dict | None, max_staleness: int | None
+) -> bool:
+    limit = MAX_STALENESS if max_staleness is None else max_staleness
+    return bool(cached) and int(time.time()) < _expires(function, cached) + limit
+
+
+def _request_params(function: str, symbol: str, params_extra: dict) -> dict:
+    return {"function": function, "symbol": symbol, "apikey": API_KEY, **params_extra}
+
+
+def _check_response(data: dict) -> dict:
+    # If rate-limited or other informational response
+    if _is_limit_or_error(data):
+        raise AlphaVantageError(
+            data.get("Information")
+            or data.get("Note")
+            or data.get("Error Message")
+            or "Unknown API error"
+        )
+    return data
+
+
+def _store_response(function: str, symbol: str, params_extra: dict, data: dict) -> dict:
+    return cache_set(function, symbol, params_extra, _check_response(data))
+
+
+def _lease_owner() -> str:
+    return f"{socket.gethostname()}:{os.getpid()}"
+
+
+def _acquire_fetch_lease(key: tuple) -> bool:
+    """Claim the right to fetch key for FETCH_LEASE_SECONDS, across processes."""
+    return CACHE.acquire_lease(key, _lease_owner(), FETCH_LEASE_SECONDS)
+
+
+def _release_fetch_lease(key: tuple):
+    CACHE.release_lease(key, _lease_owner())
+
+
+# Single-flight: one in-process fetch per cache key, everyone else waits on it
+_INFLIGHT: dict[tuple, Future] = {}
+_INFLIGHT_LOCK = threading.Lock()
+
+
+def _single_flight(key: tuple, fn):
+    with _INFLIGHT_LOCK:
+        future = _INFLIGHT.get(key)
+        leader = future is None
+        if leader:
+            future = _INFLIGHT[key] = Future()
+    if not leader:
+        return future.result()
+
+    try:
+        future.set_result(fn())
+    except BaseException as exc:
+        future.set_exception(exc)
+    finally:
+        with _INFLIGHT_LOCK:
+            _INFLIGHT.pop(key, None)
+    return future.result()
+
+
+# Offline payload source used instead of HTTP when DATA_PROVIDER=fixtures
+FIXTURES = FixtureProvider() if DATA_PROVIDER == "fixtures" else None
+
+
+def fetch_upstream(function: str, symbol: str, params_extra: dict | None = None) -> dict:
+    """One upstream call, bypassing api_cache; raises AlphaVantageError for
+    limit and error bodies. For callers that persist payloads themselves."""
+    params = _request_params(function, symbol, params_extra or {})
+    if FIXTURES is not None:
+        return _check_response(FIXTURES.fetch(params))
+
+    # Wait for a quota slot rather than spending a call that will be refused
+    RATE_LIMITER.acquire()
+
+    # Make API call
+    resp = SESSION.get(BASE_URL, params=params, timeout=REQUEST_TIMEOUT)
+    resp.raise_for_status()
+    return _check_response(resp.json())
+
+
+def _fetch_and_store(function: str, symbol: str, params_extra: dict) -> dict:
+    """Fetch upstream and cache the payload; returns the stored entry."""
+    data = fetch_upstream(function, symbol, params_extra)
+    return cache_set(function, symbol, params_extra, data)
+
+
+def _leased_fetch(key: tuple, params_extra: dict, newer_than: int | None = None) -> dict:
+    function, symbol, _ = key
+    # Another process holds the lease: pick its result up from the cache
+    while not _acquire_fetch_lease(key):
+        time.sleep(FETCH_LEASE_POLL)
+        latest = cache_get(function, symbol, params_extra, use_memory=False)
+        if _is_fresh(function, latest, newer_than):
+            return latest
+    try:
+        latest = cache_get(function, symbol, params_extra, use_memory=False)
+        if _is_fresh(function, latest, newer_than):
+            return latest
+        return _fetch_and_store(function, symbol, params_extra)
+    finally:
+        _release_fetch_lease(key)
+
+
+_REFRESH_POOL = ThreadPoolExecutor(
+    max_workers=REFRESH_WORKERS, thread_name_prefix="av-refresh"
+)
+
+
+# Keys with a background refresh queued or running; stale hits on them don't
+# submit another job, so the pool's queue stays bounded by the stale key count
+_REFRESHING: set[tuple] = set()
+_REFRESHING_LOCK = threading.Lock()
+
+
+def _schedule_refresh(key: tuple, params_extra: dict):
+    with _REFRESHING_LOCK:
+        if key in _REFRESHING:
+            return
+        _REFRESHING.add(key)
+
+    def _refresh():
+        try:
+            _single_flight(key, lambda: _leased_fetch(key, params_extra))
+        except Exception:
+            logger.warning("Background refresh of %s failed", key, exc_info=True)
+        finally:
+            with _REFRESHING_LOCK:
+                _REFRESHING.discard(key)
+
+    try:
+        _REFRESH_POOL.submit(_refresh)
+    except RuntimeError:
+        # Pool shut down at interpreter exit
+        with _REFRESHING_LOCK:
+            _REFRESHING.discard(key)
+
+
+def _cached_api_result(
     function: str,
     symbol: str,
     params_extra: dict | None = None,
     allow_stale_on_limit: bool = True,
-):
+    stale_while_revalidate: bool | None = None,
+    max_staleness: int | None = None,
+) -> CacheResult:
     params_extra = params_extra or {}
-    ttl = TTL_BY_FUNCTION.get(function, 24 * 3600)
     cached = cache_get(function, symbol, params_extra)
 
     # Serve fresh cache if within TTL
-    now = int(time.time())
-    if cached and (now - cached["ts"] < ttl):
-        return cached["data"]
+    if _is_fresh(function, cached):
+        return _result(cached)
 
-    # Make API call
-    params = {"function": function, "symbol": symbol, "apikey": API_KEY, **params_extra}
-    resp = SESSION.get(BASE_URL, params=params, timeout=30)
-    resp.raise_for_status()
-    data = resp.json()
+    key = (function, symbol, _params_hash(params_extra))
+    if stale_while_revalidate is None:
+        stale_while_revalidate = STALE_WHILE_REVALIDATE
+    if stale_while_revalidate and _within_max_staleness(function, cached, max_staleness):
+        _schedule_refresh(key, params_extra)
+        return _result(cached, stale=True, revalidating=True)
 
-    # If rate-limited or other informational response
-    if _is_limit_or_error(data):
+    try:
+        entry = _single_flight(key, lambda: _leased_fetch(key, params_extra))
+    except _STALE_FALLBACK_ERRORS:
         if cached and allow_stale_on_limit:
-            return cached["data"]
-        raise RuntimeError(
-            data.get("Information")
-            or data.get("Note")
-            or data.get("Error Message")
-            or "Unknown API error"
+            return _result(cached, stale=True)
+        raise
+    return _result(entry)
+
+
+def refresh_cache_entry(
+    function: str, symbol: str, params_extra: dict | None = None
+) -> CacheResult:
+    """Fetch upstream even if the cached entry is still fresh (used by the
+    pre-warmer). Concurrent refreshes and misses for the key share one call."""
+    params_extra = params_extra or {}
+    key = (function, symbol, _params_hash(params_extra))
+    requested_at = int(time.time())
+    entry = _single_flight(
+        key, lambda: _leased_fetch(key, params_extra, newer_than=requested_at)
+    )
+    return _result(entry)
+
+
+def _cached_api_call(
+    function: str,
+    symbol: str,
+    params_extra: dict | None = None,
+    allow_stale_on_limit: bool = True,
+    stale_while_revalidate: bool | None = None,
+    max_staleness: int | None = None,
+):
+    return _cached_api_result(
+        function,
+        symbol,
+        params_extra,
+        allow_stale_on_limit,
+        stale_while_revalidate,
+        max_staleness,
+    ).data
+
+
+# httpx clients are bound to the event loop that created them, so keep one
+# pooled client per running loop.
+_ASYNC_CLIENTS: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, httpx.AsyncClient]" = (
+    weakref.WeakKeyDictionary()
+)
+_ASYNC_INFLIGHT: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, dict[tuple, asyncio.Task]]" = (
+    weakref.WeakKeyDictionary()
+)
+
+
+def _get_async_client() -> httpx.AsyncClient:
+    loop = asyncio.get_running_loop()
+    client = _ASYNC_CLIENTS.get(loop)
+    if client is None or client.is_closed:
+        limits = httpx.Limits(
+            max_connections=ASYNC_MAX_CONNECTIONS,
+            max_keepalive_connections=ASYNC_MAX_CONNECTIONS,
         )
+        client = httpx.AsyncClient(limits=limits, timeout=REQUEST_TIMEOUT)
+        _ASYNC_CLIENTS[loop] = client
+    return client
 
-    cache_set(function, symbol, params_extra, data)
-    return data
+
+async def aclose_async_client():
+    """Close the pooled async client of the running event loop, if any."""
+    client = _ASYNC_CLIENTS.pop(asyncio.get_running_loop(), None)
+    if client is not None:
+        await client.aclose()
+
+
+def _retry_delay(attempt: int, resp: httpx.Response | None) -> float:
+    # Same schedule as the urllib3 Retry on SESSION, honouring Retry-After
+    if resp is not None and resp.headers.get("Retry-After", "").isdigit():
+        return float(resp.headers["Retry-After"])
+    return RETRY_BACKOFF_FACTOR * (2**attempt)
+
+
+async def _async_get(params: dict) -> dict:
+    client = _get_async_client()
+    for attempt in range(RETRY_TOTAL + 1):
+        resp = None
+        try:
+            resp = await client.get(BASE_URL, params=params)
+        except httpx.TransportError:
+            if attempt == RETRY_TOTAL:
+                raise
+        else:
+            if resp.status_code not in RETRY_STATUSES or attempt == RETRY_TOTAL:
+                resp.raise_for_status()
+                return resp.json()
+        await asyncio.sleep(_retry_delay(attempt, resp))
+
+
+async def _async_single_flight(key: tuple, factory):
+    inflight = _ASYNC_INFLIGHT.setdefault(asyncio.get_running_loop(), {})
+    task = inflight.get(key)
+    if task is None:
+        task = inflight[key] = asyncio.ensure_future(factory())
+        task.add_done_callback(lambda _: inflight.pop(key, None))
+    # A cancelled waiter must not cancel the fetch the others are waiting on
+    return await asyncio.shield(task)
+
+
+async def _async_leased_fetch(key: tuple, params_extra: dict) -> dict:
+    function, symbol, _ = key
+    while not await asyncio.to_thread(_acquire_fetch_lease, key):
+        await asyncio.sleep(FETCH_LEASE_POLL)
+        latest = await asyncio.to_thread(
+            cache_get, function, symbol, params_extra, use_memory=False
+        )
+        if _is_fresh(function, latest):
+            return latest
+    try:
+        latest = await asyncio.to_thread(
+            cache_get, function, symbol, params_extra, use_memory=False
+        )
+        if _is_fresh(function, latest):
+            return latest
+        params = _request_params(function, symbol, params_extra)
+        if FIXTURES is not None:
+            data = await FIXTURES.fetch_async(params)
+        else:
+            await RATE_LIMITER.acquire_async()
+            data = await _async_get(params)
+        return await asyncio.to_thread(
+            _store_response, function, symbol, params_extra, data
+        )
+    finally:
+        await asyncio.to_thread(_release_fetch_lease, key)
+
+
+# Strong references to fire-and-forget refresh tasks until they finish
+_ASYNC_REFRESH_TASKS: set[asyncio.Task] = set()
+
+
+async def _async_cached_api_result(
+    function: str,
+    symbol: str,
+    params_extra: dict | None = None,
+    allow_stale_on_limit: bool = True,
+    stale_while_revalidate: bool | None = None,
+    max_staleness: int | None = None,
+) -> CacheResult:
+    params_extra = params_extra or {}
+    key = (function, symbol, _params_hash(params_extra))
+    # SQLite is blocking, so only memory misses go to the default executor
+    cached = MEMORY_CACHE.get(key)
+    if cached is None:
+        cached = await asyncio.to_thread(
+            cache_get, function, symbol, params_extra, use_memory=False
+        )
+    elif _record_touch(key):
+        await asyncio.to_thread(_flush_touches)
+
+    if _is_fresh(function, cached):
+        return _result(cached)
+
+    def _fetch():
+        return _async_single_flight(key, lambda: _async_leased_fetch(key, params_extra))
+
+    if stale_while_revalidate is None:
+        stale_while_revalidate = STALE_WHILE_REVALIDATE
+    if stale_while_revalidate and _within_max_staleness(function, cached, max_staleness):
+        task = asyncio.ensure_future(_fetch())
+        _ASYNC_REFRESH_TASKS.add(task)
+        task.add_done_callback(_ASYNC_REFRESH_TASKS.discard)
+        task.add_done_callback(lambda t: t.cancelled() or t.exception())
+        return _result(cached, stale=True, revalidating=True)
+
+    try:
+        entry = await _fetch()
+    except _STALE_FALLBACK_ERRORS:
+        if cached and allow_stale_on_limit:
+            return _result(cached, stale=True)
+        raise
+    return _result(entry)
+
+
+async def _async_cached_api_call(
+    function: str,
+    symbol: str,
+    params_extra: dict | None = None,
+    allow_stale_on_limit: bool = True,
+    stale_while_revalidate: bool | None = None,
+    max_staleness: int | None = None,
+):
+    result = await _async_cached_api_result(
+        function,
+        symbol,
+        params_extra,
+        allow_stale_on_limit,
+        stale_while_revalidate,
+        max_staleness,
+    )
+    return result.data
 
 
 def get_company_overview(symbol: str) -> dict:
     """Alpha Vantage Fundamental Data: Company Overview (returns raw JSON)."""
     return _cached_api_call("OVERVIEW", symbol)
-    #return MOCK_OVERVIEW
+
+
+def get_company_overview_result(symbol: str) -> CacheResult:
+    """Company Overview with freshness metadata (see CacheResult)."""
+    return _cached_api_result("OVERVIEW", symbol)
+
+
+# Shared by every bulk call, so worker threads (and their per-thread SQLite
+# connections) are reused instead of being created per call
+_FETCH_POOL = ThreadPoolExecutor(
+    max_workers=FETCH_MAX_WORKERS, thread_name_prefix="av-fetch"
+)
+
+
+def run_per_symbol(
+    fn,
+    symbols: list[str],
+    max_workers: int | None,
+    pool: ThreadPoolExecutor | None = None,
+) -> list:
+    """Run fn(symbol) on pool (the shared fetch pool by default), at most
+    max_workers at a time; results keep input order and failures are
+    returned in place as the raised exception. A max_workers beyond the
+    pool's size gets a pool of its own for the call. fn must not call back
+    into run_per_symbol."""
+    symbols = list(symbols)
+    if not symbols:
+        return []
+    results: list = [None] * len(symbols)
+    # next() on a count is atomic, so each worker claims the next unclaimed symbol
+    claim = itertools.count()
+
+    def _worker():
+        while (i := next(claim)) < len(symbols):
+            try:
+                results[i] = fn(symbols[i])
+            except Exception as exc:
+                results[i] = exc
+
+    pool = pool or _FETCH_POOL
+    workers = max(1, min(max_workers or pool._max_workers, len(symbols)))
+    if workers > pool._max_workers:
+        with ThreadPoolExecutor(workers, thread_name_prefix="av-fetch-wide") as wide:
+            for future in [wide.submit(_worker) for _ in range(workers)]:
+                future.result()
+        return results
+    for future in [pool.submit(_worker) for _ in range(workers)]:
+        future.result()
+    return results
+
+
+def _bulk_cached_results(
+    function: str, fn, symbols: list[str], max_workers: int | None
+) -> list[CacheResult | Exception]:
+    # Fresh hits come from one batched cache read; only the rest go to the pool
+    symbols = list(symbols)
+    cached = cache_get_many(function, symbols)
+    results = {
+        s: _result(entry) for s, entry in cached.items() if _is_fresh(function, entry)
+    }
+    misses = [s for s in dict.fromkeys(symbols) if s not in results]
+    results.update(zip(misses, run_per_symbol(fn, misses, max_workers)))
+    return [results[s] for s in symbols]
+
+
+def get_company_overviews(
+    symbols: list[str], max_workers: int | None = None
+) -> list[dict | Exception]:
+    """Company Overview for many symbols at once.
+
+    Returns one entry per input symbol, in input order: the raw JSON on success
+    or the exception raised for that symbol.
+    """
+    results = _bulk_cached_results(
+        "OVERVIEW", get_company_overview_result, symbols, max_workers
+    )
+    return [r.data if isinstance(r, CacheResult) else r for r in results]
+
+
+# Parsed records keyed by (function, digest). Content-addressed, so they never
+# go stale and every view shares one typed copy; treat them as read-only.
+PARSED_CACHE = MemoryCache(MEMORY_CACHE_SIZE, float("inf"))
+_PARSERS = {
+    "OVERVIEW": parse_overview,
+    "INCOME_STATEMENT": parse_income_statement,
+}
+
+
+def parsed_record(function: str, data: dict, digest: str | None = None):
+    """Typed record for a payload, parsed at most once per distinct content."""
+    key = (function, digest or payload_digest(data))
+    record = PARSED_CACHE.get(key)
+    if record is None:
+        record = _PARSERS[function](data)
+        PARSED_CACHE.put(key, record)
+    return record
+
+
+def get_company_overview_record(symbol: str) -> dict:
+    """Company Overview as a typed record (see parsers.parse_overview)."""
+    result = get_company_overview_result(symbol)
+    return parsed_record("OVERVIEW", result.data, result.digest)
+
+
+def get_company_overview_records(
+    symbols: list[str], max_workers: int | None = None
+) -> list[dict | Exception]:
+    """Typed variant of get_company_overviews; failures are returned in place."""
+    results = _bulk_cached_results(
+        "OVERVIEW", get_company_overview_result, symbols, max_workers
+    )
+    return [
+        parsed_record("OVERVIEW", r.data, r.digest) if isinstance(r, CacheResult) else r
+        for r in results
+    ]
+
+
+async def async_get_company_overview(symbol: str) -> dict:
+    """Async variant of get_company_overview."""
+    return await _async_cached_api_call("OVERVIEW", symbol)
+
+
+async def async_get_company_overviews(
+    symbols: list[str], max_concurrency: int | None = None
+) -> list[dict | Exception]:
+    """Async variant of get_company_overviews, capped at max_concurrency
+    in-flight requests (defaults to ASYNC_MAX_CONNECTIONS)."""
+    symbols = list(symbols)
+    cached = await asyncio.to_thread(cache_get_many, "OVERVIEW", symbols)
+    sem = asyncio.Semaphore(max_concurrency or ASYNC_MAX_CONNECTIONS)
+
+    async def _one(symbol):
+        if _is_fresh("OVERVIEW", cached.get(symbol)):
+            return cached[symbol]["data"]
+        async with sem:
+            return await async_get_company_overview(symbol)
+
+    return await asyncio.gather(*(_one(s) for s in symbols), return_exceptions=True)
+
+
+def get_income_statement_result(symbol: str) -> CacheResult:
+    """Alpha Vantage Fundamental Data: Income Statement, raw JSON with
+    freshness metadata (see CacheResult)."""
+    return _cached_api_result("INCOME_STATEMENT", symbol)
+
+
+def get_income_statement(symbol: str) -> IncomeStatement:
+    """Annual and quarterly income statements as typed frames, parsed once
+    per distinct payload."""
+    result = get_income_statement_result(symbol)
+    return parsed_record("INCOME_STATEMENT", result.data, result.digest)
+
+
+def get_income_statements(
+    symbols: list[str], max_workers: int | None = None
+) -> list[IncomeStatement | Exception]:
+    """get_income_statement for many symbols; failures are returned in place."""
+    results = _bulk_cached_results(
+        "INCOME_STATEMENT", get_income_statement_result, symbols, max_workers
+    )
+    return [
+        parsed_record("INCOME_STATEMENT", r.data, r.digest)
+        if isinstance(r, CacheResult)
+        else r
+        for r in results
+    ]
@@ -1,7 +1,18 @@
+import os
+import json
 from dash import dcc
 import plotly.graph_objs as go
 import plotly.express as px
 import pandas as pd
+from client import MemoryCache
+from metrics import METRICS
+
+# Serialized chart figures kept for repeat dropdown selections, across sessions
+FIGURE_CACHE_SIZE = int(os.getenv("FIGURE_CACHE_SIZE", "256"))
+# Figures by (snapshot version, chart, fields), as plain JSON-ready dicts so
+# a hit is handed straight to Dash; a new version's figures are built on
+# first request and old ones age out of the LRU
+FIGURE_CACHE = MemoryCache(FIGURE_CACHE_SIZE, float("inf"))
 
 # Pastel color palette
 PASTEL_COLORS = [
@@ -16,19 +27,18 @@ PASTEL_COLORS = [
 ]
 
 
-def create_bar_chart(df: pd.DataFrame, target_field: str):
-    """Create a bar chart for the target field across all symbols."""
-    df_chart = df.copy()
-    if target_field in df_chart.columns:
-        df_chart[target_field] = pd.to_numeric(df_chart[target_field], errors="coerce")
+def bar_chart_figure(df: pd.DataFrame, target_field: str) -> go.Figure:
+    """Bar chart figure for the target field across all symbols.
 
+    df is a typed, read-only snapshot view; only the two plotted columns are read.
+    """
     fig = go.Figure(
         data=[
             go.Bar(
-                x=df_chart["Symbol"],
-                y=df_chart[target_field],
+                x=df["Symbol"],
+                y=df[target_field],
                 name=target_field,
-                marker_color=PASTEL_COLORS[: len(df_chart)],
+                marker_color=PASTEL_COLORS[: len(df)],
                 marker_line=dict(width=1, color="rgba(255,255,255,0.3)"),
             )
         ]
@@ -49,18 +59,22 @@ def create_bar_chart(df: pd.DataFrame, target_field: str):
         font=dict(color="#E8E8E8", size=12),
     )
 
-    return dcc.Graph(figure=fig, id="bar-chart")
+    return fig
 
 
-def create_bubble_chart(df: pd.DataFrame, target_field_x: str, target_field_y: str):
-    """Create a bubble chart with MarketCap as x-axis, target as y-axis, Revenue as bubble size."""
-    df_chart = df.copy()
+def create_bar_chart(df: pd.DataFrame, target_field: str):
+    """Create a bar chart for the target field across all symbols."""
+    return dcc.Graph(figure=bar_chart_figure(df, target_field), id="bar-chart")
 
-    # Convert fields to numeric
-    numeric_fields = [target_field_x, target_field_y, "MarketCapitalization"]
-    for field in numeric_fields:
-        if field in df_chart.columns:
-            df_chart[field] = pd.to_numeric(df_chart[field], errors="coerce")
+
+def bubble_chart_figure(
+    df: pd.DataFrame, target_field_x: str, target_field_y: str
+) -> go.Figure:
+    """Bubble chart figure with MarketCap as bubble size."""
+    # Only the plotted columns of the typed snapshot view, already numeric
+    columns = [target_field_x, target_field_y, "MarketCapitalization"]
+    columns += ["Symbol", "Name", "Sector"]
+    df_chart = df[list(dict.fromkeys(columns))]
 
     # Create bubble chart with pastel colors
     fig = px.scatter(
@@ -102,6 +116,12 @@ def create_bubble_chart(df: pd.DataFrame, target_field_x: str, target_field_y: s
         marker=dict(line=dict(width=1, color="rgba(255,255,255,0.4)"), opacity=0.8)
     )
 
+    return fig
+
+
+def create_bubble_chart(df: pd.DataFrame, target_field_x: str, target_field_y: str):
+    """Create a bubble chart with MarketCap as x-axis, target as y-axis, Revenue as bubble size."""
+    fig = bubble_chart_figure(df, target_field_x, target_field_y)
     return dcc.Graph(figure=fig, id="bubble-chart")
 
 
@@ -120,3 +140,18 @@ CHART_TARGET_OPTIONS = [
     {"label": "Beta", "value": "Beta"},
     {"label": "Dividend Yield", "value": "DividendYield"},
 ]
+# Every derived metric can be charted
+CHART_TARGET_OPTIONS += [{"label": m.label, "value": m.name} for m in METRICS.values()]
+
+
+def cached_figure(snapshot, chart: str, build, *fields) -> dict:
+    """Figure dict for a store snapshot, building it only if this version and
+    selection has not been rendered before."""
+    key = (snapshot.version, chart, *fields)
+    figure = FIGURE_CACHE.get(key)
+    if figure is None:
+        # Round-trip once through Plotly's encoder: numpy arrays become
+        # JSON-ready data and every session shares the result read-only
+        figure = json.loads(build(snapshot.view, *fields).to_json())
+        FIGURE_CACHE.put(key, figure)
+    return figure
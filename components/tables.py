@@ -1,5 +1,6 @@
 import pandas as pd
 import dash_ag_grid as dag
+from metrics import METRICS, NUMBER, PCT, USD
 
 
 KEY_COLUMNS = [
@@ -21,27 +22,21 @@ KEY_COLUMNS = [
     "AnalystRatingHold",
     "AnalystRatingSell",
     "AnalystRatingStrongSell",
+    *METRICS,
 ]
 
+# Grid formatter for each metric format; implemented in assets/dashAgGridFunctions.js
+METRIC_FORMATTERS = {
+    USD: "USD(params.value)",
+    PCT: "PCT(params.value)",
+    NUMBER: "NUM(params.value)",
+}
+
 
 def build_overview_grid(overview_df: pd.DataFrame):
-    # Keep only desired columns
+    # Keep only desired columns; overview_df is the typed snapshot view
     display_cols = [c for c in KEY_COLUMNS if c in overview_df.columns]
-    df = overview_df[display_cols].copy()
-
-    # Ensure numeric types for formatting in the grid (strings from API -> numbers)
-    num_cols = [
-        "MarketCapitalization",
-        "RevenueTTM",
-        "RevenuePerShareTTM",
-        "ProfitMargin",
-        "OperatingMarginTTM",
-        "EBITDA",
-        "AnalystTargetPrice",
-    ]
-    for c in num_cols:
-        if c in df.columns:
-            df[c] = pd.to_numeric(df[c], errors="coerce")
+    df = overview_df[display_cols]
 
     # Column definitions with formatters and filter/sort
     column_defs = []
@@ -66,6 +61,10 @@ def build_overview_grid(overview_df: pd.DataFrame):
         if c in ["ProfitMargin", "OperatingMarginTTM"]:
             col_def["type"] = "numericColumn"
             col_def["valueFormatter"] = {"function": "PCT(params.value)"}
+        if c in METRICS:
+            col_def["headerName"] = METRICS[c].label
+            col_def["type"] = "numericColumn"
+            col_def["valueFormatter"] = {"function": METRIC_FORMATTERS[METRICS[c].format]}
         if c == "RevenueTTM":
             # Flag low revenue
             col_def["cellClassRules"] = {
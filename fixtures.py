@@ -0,0 +1,333 @@
+import os
+import time
+import zlib
+import random
+import asyncio
+import threading
+from datetime import date, timedelta
+
+# Synthetic symbols the app watches when DATA_PROVIDER=fixtures
+FIXTURE_SYMBOLS = int(os.getenv("FIXTURE_SYMBOLS", "50"))
+# Simulated upstream latency per call, in seconds, +/- FIXTURE_LATENCY_JITTER
+FIXTURE_LATENCY = float(os.getenv("FIXTURE_LATENCY", "0.05"))
+FIXTURE_LATENCY_JITTER = float(os.getenv("FIXTURE_LATENCY_JITTER", "0.5"))
+# Share of calls answered with a throttling "Note" or an "Error Message" body
+FIXTURE_ERROR_RATE = float(os.getenv("FIXTURE_ERROR_RATE", "0"))
+FIXTURE_SEED = int(os.getenv("FIXTURE_SEED", "7"))
+# Latest fiscal quarter end in generated statements
+FIXTURE_AS_OF = date.fromisoformat(os.getenv("FIXTURE_AS_OF", "2025-06-30"))
+# Last trading day and depth of generated daily price history
+FIXTURE_PRICES_UNTIL = date.fromisoformat(
+    os.getenv("FIXTURE_PRICES_UNTIL", FIXTURE_AS_OF.isoformat())
+)
+FIXTURE_PRICE_YEARS = int(os.getenv("FIXTURE_PRICE_YEARS", "10"))
+
+SECTORS = {
+    "TECHNOLOGY": ["SEMICONDUCTORS", "ELECTRONIC COMPONENTS", "SOFTWARE"],
+    "MANUFACTURING": ["SPECIALTY CHEMICALS", "INDUSTRIAL MACHINERY", "AEROSPACE"],
+    "ENERGY & TRANSPORTATION": ["OIL & GAS", "AIR FREIGHT", "UTILITIES"],
+    "LIFE SCIENCES": ["MEDICAL DEVICES", "DIAGNOSTICS"],
+}
+EXCHANGES = [("NYSE", "USA"), ("NASDAQ", "USA"), ("NYSE", "Switzerland")]
+_MONTHS = ["March", "June", "September", "December"]
+
+
+def synthetic_symbols(n: int) -> list[str]:
+    """n distinct four-letter tickers, always the same for the same n."""
+    symbols = []
+    for i in range(n):
+        code = ""
+        for _ in range(4):
+            i, rem = divmod(i, 26)
+            code = chr(ord("A") + rem) + code
+        symbols.append(code)
+    return symbols
+
+
+def _rng(symbol: str, salt: str, seed: int = FIXTURE_SEED) -> random.Random:
+    # crc32 rather than hash(): str hashes are salted per process
+    return random.Random(zlib.crc32(f"{seed}:{salt}:{symbol}".encode()))
+
+
+def _num(value: float, digits: int = 4) -> str:
+    return str(round(value, digits))
+
+
+def _quarter_ends(latest: date, count: int) -> list[date]:
+    ends = [latest]
+    while len(ends) < count:
+        # Last day of the month three months back: the 1st of two months
+        # back, minus a day
+        month, year = ends[-1].month - 2, ends[-1].year
+        if month < 1:
+            month, year = month + 12, year - 1
+        ends.append(date(year, month, 1) - timedelta(days=1))
+    return ends
+
+
+def fixture_overview(symbol: str, seed: int = FIXTURE_SEED) -> dict:
+    """A realistic OVERVIEW payload for symbol, with every value a string as
+    Alpha Vantage sends it. Identical for the same symbol and seed."""
+    rng = _rng(symbol, "OVERVIEW", seed)
+    sector = rng.choice(list(SECTORS))
+    exchange, country = rng.choice(EXCHANGES)
+    shares = rng.randint(20, 2000) * 1_000_000
+    price = rng.uniform(8, 400)
+    revenue = shares * price * rng.uniform(0.2, 3.0)
+    profit_margin = rng.uniform(-0.1, 0.3)
+    operating_margin = profit_margin + rng.uniform(0.0, 0.1)
+    eps = revenue * profit_margin / shares
+    book_value = price / rng.uniform(0.8, 8)
+    dividend = price * rng.uniform(0, 0.05) if rng.random() < 0.6 else 0.0
+    ratings = [rng.randint(0, 12) for _ in range(5)]
+    ex_dividend = FIXTURE_AS_OF + timedelta(days=rng.randint(1, 9))
+    dividend_date = ex_dividend + timedelta(days=rng.randint(10, 40))
+    return {
+        "Symbol": symbol,
+        "AssetType": "Common Stock",
+        "Name": f"{symbol.title()} {rng.choice(['Corp', 'Inc', 'Holdings', 'Ltd'])}",
+        "Description": f"{symbol} is a synthetic {sector.lower()} company.",
+        "CIK": str(rng.randint(10_000, 1_999_999)),
+        "Exchange": exchange,
+        "Currency": "USD",
+        "Country": country,
+        "Sector": sector,
+        "Industry": rng.choice(SECTORS[sector]),
+        "Address": f"{rng.randint(1, 999)} MAIN ST, SPRINGFIELD, {country.upper()}",
+        "OfficialSite": f"https://www.{symbol.lower()}.example.com",
+        "FiscalYearEnd": rng.choice(_MONTHS),
+        "LatestQuarter": FIXTURE_AS_OF.isoformat(),
+        "MarketCapitalization": str(int(shares * price)),
+        "EBITDA": str(int(revenue * (operating_margin + rng.uniform(0.02, 0.08)))),
+        "PERatio": _num(price / eps, 2) if eps > 0 else "None",
+        "PEGRatio": _num(rng.uniform(0.5, 3.5), 3),
+        "BookValue": _num(book_value, 2),
+        "DividendPerShare": _num(dividend, 2) if dividend else "None",
+        "DividendYield": _num(dividend / price) if dividend else "0",
+        "EPS": _num(eps, 2),
+        "RevenuePerShareTTM": _num(revenue / shares, 2),
+        "ProfitMargin": _num(profit_margin, 3),
+        "OperatingMarginTTM": _num(operating_margin, 3),
+        "ReturnOnAssetsTTM": _num(profit_margin * rng.uniform(0.3, 0.8), 3),
+        "ReturnOnEquityTTM": _num(profit_margin * rng.uniform(0.8, 2.5), 3),
+        "RevenueTTM": str(int(revenue)),
+        "GrossProfitTTM": str(int(revenue * rng.uniform(0.25, 0.6))),
+        "DilutedEPSTTM": _num(eps * 0.99, 2),
+        "QuarterlyEarningsGrowthYOY": _num(rng.uniform(-0.4, 0.6), 3),
+        "QuarterlyRevenueGrowthYOY": _num(rng.uniform(-0.2, 0.3), 3),
+        "AnalystTargetPrice": _num(price * rng.uniform(0.8, 1.4), 2),
+        "AnalystRatingStrongBuy": str(ratings[0]),
+        "AnalystRatingBuy": str(ratings[1]),
+        "AnalystRatingHold": str(ratings[2]),
+        "AnalystRatingSell": str(ratings[3] // 3),
+        "AnalystRatingStrongSell": str(ratings[4] // 4),
+        "TrailingPE": _num(price / eps, 2) if eps > 0 else "-",
+        "ForwardPE": _num(price / (eps * 1.1), 2) if eps > 0 else "-",
+        "PriceToSalesRatioTTM": _num(shares * price / revenue, 3),
+        "PriceToBookRatio": _num(price / book_value, 2),
+        "EVToRevenue": _num(shares * price / revenue * rng.uniform(1.0, 1.3), 3),
+        "EVToEBITDA": _num(rng.uniform(5, 30), 2),
+        "Beta": _num(rng.uniform(0.4, 2.0), 3),
+        "52WeekHigh": _num(price * rng.uniform(1.05, 1.5), 2),
+        "52WeekLow": _num(price * rng.uniform(0.5, 0.95), 2),
+        "50DayMovingAverage": _num(price * rng.uniform(0.9, 1.1), 2),
+        "200DayMovingAverage": _num(price * rng.uniform(0.8, 1.2), 2),
+        "SharesOutstanding": str(shares),
+        "SharesFloat": str(int(shares * rng.uniform(0.7, 1.0))),
+        "PercentInsiders": _num(rng.uniform(0, 15), 3),
+        "PercentInstitutions": _num(rng.uniform(40, 98), 3),
+        "DividendDate": dividend_date.isoformat() if dividend else "None",
+        "ExDividendDate": ex_dividend.isoformat() if dividend else "None",
+    }
+
+
+def _income_report(rng: random.Random, end: date, revenue: float) -> dict:
+    cost = revenue * rng.uniform(0.4, 0.75)
+    gross = revenue - cost
+    sga = revenue * rng.uniform(0.08, 0.2)
+    rnd = revenue * rng.uniform(0.0, 0.12)
+    operating = gross - sga - rnd
+    depreciation = revenue * rng.uniform(0.02, 0.06)
+    interest = revenue * rng.uniform(0.0, 0.03)
+    pretax = operating - interest
+    tax = max(pretax, 0) * rng.uniform(0.12, 0.26)
+    return {
+        "fiscalDateEnding": end.isoformat(),
+        "reportedCurrency": "USD",
+        "grossProfit": str(int(gross)),
+        "totalRevenue": str(int(revenue)),
+        "costOfRevenue": str(int(cost)),
+        "costofGoodsAndServicesSold": str(int(cost)),
+        "operatingIncome": str(int(operating)),
+        "sellingGeneralAndAdministrative": str(int(sga)),
+        "researchAndDevelopment": str(int(rnd)) if rnd > revenue * 0.01 else "None",
+        "operatingExpenses": str(int(sga + rnd)),
+        "interestExpense": str(int(interest)),
+        "depreciationAndAmortization": str(int(depreciation)),
+        "incomeBeforeTax": str(int(pretax)),
+        "incomeTaxExpense": str(int(tax)),
+        "ebit": str(int(operating)),
+        "ebitda": str(int(operating + depreciation)),
+        "netIncome": str(int(pretax - tax)),
+    }
+
+
+def fixture_income_statement(
+    symbol: str, seed: int = FIXTURE_SEED, years: int = 5, quarters: int = 20
+) -> dict:
+    """A realistic INCOME_STATEMENT payload: annual and quarterly reports,
+    newest first, with revenue growing along a noisy trend."""
+    rng = _rng(symbol, "INCOME_STATEMENT", seed)
+    quarterly_revenue = rng.randint(50, 5000) * 1_000_000
+    growth = rng.uniform(-0.01, 0.04)
+    ends = _quarter_ends(FIXTURE_AS_OF, max(quarters, years * 4))
+    revenues = [
+        quarterly_revenue * (1 + growth) ** -i * rng.uniform(0.92, 1.08)
+        for i in range(len(ends))
+    ]
+    quarterly = [
+        _income_report(rng, end, rev) for end, rev in zip(ends[:quarters], revenues)
+    ]
+    annual = [
+        _income_report(rng, ends[4 * y], sum(revenues[4 * y : 4 * y + 4]))
+        for y in range(years)
+    ]
+    return {"symbol": symbol, "annualReports": annual, "quarterlyReports": quarterly}
+
+
+_PRICE_EPOCH = date(2000, 1, 3)
+
+
+def fixture_daily_prices(
+    symbol: str,
+    seed: int = FIXTURE_SEED,
+    outputsize: str = "compact",
+    until: date | None = None,
+) -> dict:
+    """A TIME_SERIES_DAILY_ADJUSTED payload: a random walk over weekdays up to
+    `until`, newest first. compact is the last 100 sessions, full covers
+    FIXTURE_PRICE_YEARS. The same day always has the same prices."""
+    until = until or FIXTURE_PRICES_UNTIL
+    start = until - timedelta(days=365 * FIXTURE_PRICE_YEARS)
+    rng = _rng(symbol, "PRICES", seed)
+    price = rng.uniform(8, 400)
+    series = {}
+    # The walk always starts at _PRICE_EPOCH so moving `until` only adds days
+    day = _PRICE_EPOCH
+    while day <= until:
+        if day.weekday() < 5:
+            open_ = price
+            price = max(0.5, price * (1 + rng.gauss(0.0003, 0.018)))
+            spread = abs(rng.gauss(0, 0.01))
+            volume = rng.randint(50_000, 5_000_000)
+            if day >= start:
+                series[day.isoformat()] = {
+                    "1. open": _num(open_),
+                    "2. high": _num(max(open_, price) * (1 + spread)),
+                    "3. low": _num(min(open_, price) * (1 - spread)),
+                    "4. close": _num(price),
+                    "5. adjusted close": _num(price),
+                    "6. volume": str(volume),
+                    "7. dividend amount": "0.0000",
+                    "8. split coefficient": "1.0",
+                }
+        day += timedelta(days=1)
+    days = sorted(series, reverse=True)
+    if outputsize != "full":
+        days = days[:100]
+    return {
+        "Meta Data": {
+            "1. Information": "Daily Time Series with Splits and Dividend Events",
+            "2. Symbol": symbol,
+            "3. Last Refreshed": days[0] if days else until.isoformat(),
+            "4. Output Size": "Full size" if outputsize == "full" else "Compact",
+            "5. Time Zone": "US/Eastern",
+        },
+        "Time Series (Daily)": {d: series[d] for d in days},
+    }
+
+
+GENERATORS = {
+    "OVERVIEW": fixture_overview,
+    "INCOME_STATEMENT": fixture_income_statement,
+    "TIME_SERIES_DAILY_ADJUSTED": fixture_daily_prices,
+}
+# Query params passed through to the generators that take them
+GENERATOR_OPTIONS = ("outputsize",)
+
+
+def generate(function: str, symbol: str, seed: int, params: dict) -> dict | None:
+    """The synthetic payload for a query, or None for an unknown function."""
+    generator = GENERATORS.get(function)
+    if generator is None or not symbol:
+        return None
+    options = {k: params[k] for k in GENERATOR_OPTIONS if k in params}
+    return generator(symbol, seed, **options)
+
+
+class FixtureProvider:
+    """Offline stand-in for the Alpha Vantage HTTP API.
+
+    fetch() takes the same query params as the real endpoint and returns the
+    JSON body it would, after a simulated delay; error_rate of the calls get
+    a throttling "Note" or an "Error Message" body instead.
+    """
+
+    def __init__(
+        self,
+        latency: float = FIXTURE_LATENCY,
+        latency_jitter: float = FIXTURE_LATENCY_JITTER,
+        error_rate: float = FIXTURE_ERROR_RATE,
+        seed: int = FIXTURE_SEED,
+    ):
+        self.latency = latency
+        self.latency_jitter = latency_jitter
+        self.error_rate = error_rate
+        self.seed = seed
+        self._rng = random.Random(seed)
+        self._lock = threading.Lock()
+        self.calls = 0
+        self.errors = 0
+
+    def _delay(self) -> float:
+        with self._lock:
+            jitter = self._rng.uniform(-self.latency_jitter, self.latency_jitter)
+        return max(0.0, self.latency * (1 + jitter))
+
+    def respond(self, params: dict) -> dict:
+        """The body for params, without the simulated delay."""
+        function, symbol = params.get("function"), params.get("symbol", "")
+        with self._lock:
+            self.calls += 1
+            failed = self._rng.random() < self.error_rate
+            if failed:
+                self.errors += 1
+                throttled = self._rng.random() < 0.5
+        if failed and throttled:
+            return {
+                "Note": "Thank you for using Alpha Vantage! Our standard API call "
+                "frequency is 5 calls per minute and 25 calls per day."
+            }
+        payload = None if failed else generate(function, symbol, self.seed, params)
+        if payload is None:
+            return {
+                "Error Message": "Invalid API call. Please retry or visit the "
+                "documentation for this function."
+            }
+        return payload
+
+    def fetch(self, params: dict) -> dict:
+        time.sleep(self._delay())
+        return self.respond(params)
+
+    async def fetch_async(self, params: dict) -> dict:
+        await asyncio.sleep(self._delay())
+        return self.respond(params)
+
+    def stats(self) -> dict:
+        return {
+            "calls": self.calls,
+            "errors": self.errors,
+            "latency": self.latency,
+            "error_rate": self.error_rate,
+        }
@@ -0,0 +1,181 @@
+from dataclasses import dataclass
+from typing import Callable
+import numpy as np
+import pandas as pd
+
+# How the grid formats a metric; see assets/dashAgGridFunctions.js
+USD = "usd"
+PCT = "pct"
+NUMBER = "number"
+
+# Weights for the analyst consensus score, 5 = every analyst says strong buy
+ANALYST_RATINGS = {
+    "AnalystRatingStrongBuy": 5.0,
+    "AnalystRatingBuy": 4.0,
+    "AnalystRatingHold": 3.0,
+    "AnalystRatingSell": 2.0,
+    "AnalystRatingStrongSell": 1.0,
+}
+
+
+@dataclass(frozen=True)
+class Metric:
+    """A derived column computed from whole columns of the overview frame.
+
+    compute takes the frame and returns one value per row, as a NumPy array
+    or Series aligned to the frame; it must not loop over rows.
+    """
+
+    name: str
+    label: str
+    compute: Callable[[pd.DataFrame], np.ndarray | pd.Series]
+    format: str = NUMBER
+
+
+METRICS: dict[str, Metric] = {}
+
+
+def metric(name: str, label: str, format: str = NUMBER):
+    """Register the decorated function as a metric; new metrics show up in
+    the chart dropdowns and the overview grid without further changes."""
+
+    def register(compute):
+        METRICS[name] = Metric(name, label, compute, format)
+        return compute
+
+    return register
+
+
+def _col(frame: pd.DataFrame, name: str) -> np.ndarray:
+    if name not in frame.columns:
+        return np.full(len(frame), np.nan)
+    values = frame[name].to_numpy()
+    # float64 columns come back without a copy
+    return values if values.dtype == np.float64 else values.astype("float64")
+
+
+def _ratings(frame: pd.DataFrame) -> np.ndarray:
+    # (rows, 5) analyst rating counts, strong buy first
+    return np.column_stack([_col(frame, c) for c in ANALYST_RATINGS])
+
+
+def _ratio(numerator: np.ndarray, denominator: np.ndarray, positive: bool = False):
+    # NaN where the denominator is zero (or not positive, when asked)
+    bad = denominator <= 0 if positive else denominator == 0
+    with np.errstate(divide="ignore", invalid="ignore"):
+        return np.where(bad, np.nan, numerator / denominator)
+
+
+@metric("EnterpriseValue", "Enterprise Value", USD)
+def enterprise_value(frame):
+    return _col(frame, "EVToRevenue") * _col(frame, "RevenueTTM")
+
+
+@metric("EVToEBITDADerived", "EV / EBITDA (derived)")
+def ev_to_ebitda(frame):
+    # Only meaningful for positive EBITDA
+    return _ratio(enterprise_value(frame), _col(frame, "EBITDA"), positive=True)
+
+
+@metric("GrossMarginTTM", "Gross Margin TTM", PCT)
+def gross_margin(frame):
+    return _ratio(_col(frame, "GrossProfitTTM"), _col(frame, "RevenueTTM"))
+
+
+@metric("EBITDAMargin", "EBITDA Margin", PCT)
+def ebitda_margin(frame):
+    return _ratio(_col(frame, "EBITDA"), _col(frame, "RevenueTTM"))
+
+
+@metric("GrossToOperatingSpread", "Gross - Operating Margin", PCT)
+def gross_to_operating_spread(frame):
+    return gross_margin(frame) - _col(frame, "OperatingMarginTTM")
+
+
+@metric("OperatingToNetSpread", "Operating - Net Margin", PCT)
+def operating_to_net_spread(frame):
+    return _col(frame, "OperatingMarginTTM") - _col(frame, "ProfitMargin")
+
+
+@metric("RevenueGrowthYOY", "Revenue Growth YoY", PCT)
+def revenue_growth(frame):
+    return _col(frame, "QuarterlyRevenueGrowthYOY")
+
+
+@metric("EarningsMinusRevenueGrowth", "Earnings - Revenue Growth", PCT)
+def earnings_minus_revenue_growth(frame):
+    return _col(frame, "QuarterlyEarningsGrowthYOY") - revenue_growth(frame)
+
+
+@metric("ForwardEPSGrowth", "Forward EPS Growth", PCT)
+def forward_eps_growth(frame):
+    # Trailing / forward P/E at the same price is forward / trailing EPS
+    return _ratio(_col(frame, "TrailingPE"), _col(frame, "ForwardPE"), positive=True) - 1
+
+
+@metric("EarningsYield", "Earnings Yield", PCT)
+def earnings_yield(frame):
+    return _ratio(1.0, _col(frame, "PERatio"), positive=True)
+
+
+@metric("SectorRelativePE", "P/E vs Sector Median")
+def sector_relative_pe(frame):
+    pe = pd.Series(_col(frame, "PERatio"), index=frame.index)
+    pe = pe.where(pe > 0)
+    median = pe.groupby(frame["Sector"]).transform("median")
+    return _ratio(pe.to_numpy(), median.to_numpy(dtype="float64", na_value=np.nan))
+
+
+@metric("AnalystRatingCount", "Analyst Ratings")
+def analyst_rating_count(frame):
+    counts = _ratings(frame)
+    # NaN only when no rating column is present for the row
+    total = np.nansum(counts, axis=1)
+    return np.where(np.isnan(counts).all(axis=1), np.nan, total)
+
+
+@metric("AnalystConsensusScore", "Analyst Consensus (1-5)")
+def analyst_consensus_score(frame):
+    counts = _ratings(frame)
+    weights = np.fromiter(ANALYST_RATINGS.values(), dtype="float64")
+    weighted = np.nansum(counts * weights, axis=1)
+    total = np.nansum(counts, axis=1)
+    return _ratio(weighted, total, positive=True)
+
+
+@metric("AnalystBuyShare", "Analyst Buy Share", PCT)
+def analyst_buy_share(frame):
+    counts = _ratings(frame)
+    buys = np.nansum(counts[:, :2], axis=1)
+    return _ratio(buys, np.nansum(counts, axis=1), positive=True)
+
+
+@metric("AnalystTargetUpside", "Analyst Target Upside", PCT)
+def analyst_target_upside(frame):
+    # The 50-day average stands in for the price, which OVERVIEW does not carry
+    price = _col(frame, "50DayMovingAverage")
+    return _ratio(_col(frame, "AnalystTargetPrice"), price, positive=True) - 1
+
+
+@metric("OffHigh52Week", "Below 52-Week High", PCT)
+def off_high_52_week(frame):
+    high = _col(frame, "52WeekHigh")
+    return _ratio(_col(frame, "50DayMovingAverage"), high, positive=True) - 1
+
+
+def compute_metrics(frame: pd.DataFrame) -> pd.DataFrame:
+    """Every registered metric for every row of frame, as float64 columns
+    indexed like frame."""
+    columns = {}
+    for name, m in METRICS.items():
+        values = m.compute(frame)
+        if isinstance(values, pd.Series):
+            values = values.to_numpy(dtype="float64", na_value=np.nan)
+        columns[name] = np.asarray(values, dtype="float64")
+    return pd.DataFrame(columns, index=frame.index)
+
+
+def with_metrics(frame: pd.DataFrame) -> pd.DataFrame:
+    """frame with its metric columns (re)computed over the whole universe."""
+    base = frame.drop(columns=[c for c in METRICS if c in frame.columns])
+    return pd.concat([base, compute_metrics(base)], axis=1)
@@ -0,0 +1,163 @@
+from dataclasses import dataclass
+import numpy as np
+import pandas as pd
+
+# Alpha Vantage sends every value as a string and marks gaps with these
+MISSING_VALUES = frozenset({"None", "-", "", "N/A", "NaN"})
+
+_STRING = "string"
+_FLOAT = "float64"
+_INT = "int64"
+_DATE = "datetime64[ns]"
+
+# Declared type of every documented OVERVIEW field; unknown fields stay strings
+OVERVIEW_SCHEMA = {
+    "Symbol": _STRING,
+    "AssetType": _STRING,
+    "Name": _STRING,
+    "Description": _STRING,
+    "CIK": _STRING,
+    "Exchange": _STRING,
+    "Currency": _STRING,
+    "Country": _STRING,
+    "Sector": _STRING,
+    "Industry": _STRING,
+    "Address": _STRING,
+    "OfficialSite": _STRING,
+    "FiscalYearEnd": _STRING,
+    "LatestQuarter": _DATE,
+    "MarketCapitalization": _INT,
+    "EBITDA": _INT,
+    "PERatio": _FLOAT,
+    "PEGRatio": _FLOAT,
+    "BookValue": _FLOAT,
+    "DividendPerShare": _FLOAT,
+    "DividendYield": _FLOAT,
+    "EPS": _FLOAT,
+    "RevenuePerShareTTM": _FLOAT,
+    "ProfitMargin": _FLOAT,
+    "OperatingMarginTTM": _FLOAT,
+    "ReturnOnAssetsTTM": _FLOAT,
+    "ReturnOnEquityTTM": _FLOAT,
+    "RevenueTTM": _INT,
+    "GrossProfitTTM": _INT,
+    "DilutedEPSTTM": _FLOAT,
+    "QuarterlyEarningsGrowthYOY": _FLOAT,
+    "QuarterlyRevenueGrowthYOY": _FLOAT,
+    "AnalystTargetPrice": _FLOAT,
+    "AnalystRatingStrongBuy": _INT,
+    "AnalystRatingBuy": _INT,
+    "AnalystRatingHold": _INT,
+    "AnalystRatingSell": _INT,
+    "AnalystRatingStrongSell": _INT,
+    "TrailingPE": _FLOAT,
+    "ForwardPE": _FLOAT,
+    "PriceToSalesRatioTTM": _FLOAT,
+    "PriceToBookRatio": _FLOAT,
+    "EVToRevenue": _FLOAT,
+    "EVToEBITDA": _FLOAT,
+    "Beta": _FLOAT,
+    "52WeekHigh": _FLOAT,
+    "52WeekLow": _FLOAT,
+    "50DayMovingAverage": _FLOAT,
+    "200DayMovingAverage": _FLOAT,
+    "SharesOutstanding": _INT,
+    "SharesFloat": _INT,
+    "PercentInsiders": _FLOAT,
+    "PercentInstitutions": _FLOAT,
+    "DividendDate": _DATE,
+    "ExDividendDate": _DATE,
+}
+
+NUMERIC_FIELDS = [f for f, t in OVERVIEW_SCHEMA.items() if t in (_FLOAT, _INT)]
+
+
+def _parse_value(raw, kind: str):
+    if raw is None or (isinstance(raw, str) and raw.strip() in MISSING_VALUES):
+        return pd.NaT if kind == _DATE else np.nan
+    try:
+        if kind == _FLOAT:
+            return np.float64(raw)
+        if kind == _INT:
+            # Some integer fields arrive as "123.0"
+            value = float(raw)
+            return np.int64(value) if value.is_integer() else np.float64(value)
+        if kind == _DATE:
+            return np.datetime64(raw, "ns")
+    except (TypeError, ValueError, OverflowError):
+        return pd.NaT if kind == _DATE else np.nan
+    return raw
+
+
+def parse_overview(payload: dict) -> dict:
+    """Typed copy of an OVERVIEW payload: numbers as float64/int64, dates as
+    datetime64 and missing markers as NaN/NaT. Fields outside the schema are
+    kept as-is."""
+    return {
+        field: _parse_value(raw, OVERVIEW_SCHEMA.get(field, _STRING))
+        for field, raw in payload.items()
+    }
+
+
+def overview_frame(records: list[dict]) -> pd.DataFrame:
+    """One row per parsed record with every schema column in its declared
+    dtype, followed by any fields outside the schema.
+
+    Integer columns with gaps or fractional values fall back to float64.
+    """
+    df = pd.DataFrame.from_records(records)
+    extra = [c for c in df.columns if c not in OVERVIEW_SCHEMA]
+    df = df.reindex(columns=[*OVERVIEW_SCHEMA, *extra])
+    for field in OVERVIEW_SCHEMA:
+        kind = OVERVIEW_SCHEMA[field]
+        if kind == _STRING:
+            kind = object
+        elif kind == _INT:
+            # int64 only when nothing would be lost: no gaps, no fractions
+            values = pd.to_numeric(df[field], errors="coerce")
+            if values.isna().any() or not (values % 1 == 0).all():
+                kind = _FLOAT
+        df[field] = df[field].astype(kind)
+    return df
+
+
+# INCOME_STATEMENT reports: everything but these two fields is a currency amount
+_INCOME_STATEMENT_TEXT = {"fiscalDateEnding": _DATE, "reportedCurrency": _STRING}
+
+
+@dataclass(frozen=True)
+class IncomeStatement:
+    """Parsed INCOME_STATEMENT: one row per report, indexed by fiscal period
+    end and sorted oldest first. The frames are shared; treat them as read-only."""
+
+    symbol: str
+    annual: pd.DataFrame
+    quarterly: pd.DataFrame
+
+
+def _reports_frame(reports: list[dict]) -> pd.DataFrame:
+    df = pd.DataFrame.from_records(reports or [])
+    if df.empty:
+        return pd.DataFrame(index=pd.DatetimeIndex([], name="fiscalDateEnding"))
+    # Convert whole columns at once rather than value by value
+    df = df.mask(df.isin(MISSING_VALUES))
+    for column in df.columns:
+        kind = _INCOME_STATEMENT_TEXT.get(column)
+        if kind == _DATE:
+            df[column] = pd.to_datetime(df[column], errors="coerce")
+        elif kind is None:
+            values = pd.to_numeric(df[column], errors="coerce")
+            integral = values.notna().all() and (values % 1 == 0).all()
+            df[column] = values.astype(_INT) if integral else values.astype(_FLOAT)
+    if "fiscalDateEnding" in df.columns:
+        df = df.set_index("fiscalDateEnding").sort_index()
+    return df
+
+
+def parse_income_statement(payload: dict) -> IncomeStatement:
+    """Typed annual and quarterly frames for an INCOME_STATEMENT payload."""
+    return IncomeStatement(
+        symbol=payload.get("symbol", ""),
+        annual=_reports_frame(payload.get("annualReports")),
+        quarterly=_reports_frame(payload.get("quarterlyReports")),
+    )
@@ -0,0 +1,353 @@
+import os
+import json
+import time
+import fcntl
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from pathlib import Path
+import numpy as np
+import pandas as pd
+from client import (
+    CACHE_DIR,
+    TTL_POLICY,
+    fetch_upstream,
+    run_per_symbol,
+)
+
+logger = logging.getLogger(__name__)
+
+PRICE_FUNCTION = "TIME_SERIES_DAILY_ADJUSTED"
+PRICE_DIR = CACHE_DIR / "prices"
+# Sessions in an outputsize=compact response; gaps shorter than this (less a
+# margin for holidays) are filled from compact instead of the full history
+COMPACT_POINTS = 100
+COMPACT_MARGIN = 10
+# Threads for bulk price downloads; their own pool, so long full-history
+# fetches never hold up the overview fetches on the shared one
+PRICE_FETCH_WORKERS = int(os.getenv("PRICE_FETCH_WORKERS", "4"))
+# Stored columns and their on-disk dtypes; `date` is days since the epoch
+PRICE_COLUMNS = {
+    "date": "datetime64[D]",
+    "open": "float64",
+    "high": "float64",
+    "low": "float64",
+    "close": "float64",
+    "adjusted_close": "float64",
+    "volume": "float64",
+    "dividend_amount": "float64",
+    "split_coefficient": "float64",
+}
+_FIELD_NAMES = {
+    "open": "open",
+    "high": "high",
+    "low": "low",
+    "close": "close",
+    "adjusted close": "adjusted_close",
+    "volume": "volume",
+    "dividend amount": "dividend_amount",
+    "split coefficient": "split_coefficient",
+}
+
+
+def parse_daily_series(payload: dict) -> dict[str, np.ndarray]:
+    """Columns of a daily time-series payload, oldest first."""
+    series = payload.get("Time Series (Daily)") or {}
+    df = pd.DataFrame.from_dict(series, orient="index").sort_index()
+    # "1. open" -> "open"
+    df.columns = [_FIELD_NAMES.get(c.split(". ", 1)[-1], c) for c in df.columns]
+    columns = {"date": df.index.to_numpy(dtype="datetime64[D]")}
+    for name in PRICE_COLUMNS:
+        if name == "date":
+            continue
+        if name in df.columns:
+            values = pd.to_numeric(df[name], errors="coerce")
+            columns[name] = values.to_numpy("float64")
+        else:
+            columns[name] = np.full(len(df), np.nan)
+    return columns
+
+
+class PriceSeriesStore:
+    """Append-only columnar price history, one directory per symbol.
+
+    Each column is a flat binary file of fixed-width values, read back as a
+    NumPy memmap so a date range is sliced without loading the rest.
+    meta.json holds the committed row count: rows are appended to the
+    column files first and only become visible once meta.json is replaced,
+    so readers never see a partial append. A full rewrite (after a dividend
+    or split re-adjusts the history) writes a new generation of column
+    files and switches meta.json to it in the same way.
+    """
+
+    def __init__(self, root: Path = PRICE_DIR):
+        self.root = Path(root)
+        self.root.mkdir(parents=True, exist_ok=True)
+        self._locks: dict[str, threading.Lock] = {}
+        self._locks_guard = threading.Lock()
+
+    def _dir(self, symbol: str) -> Path:
+        return self.root / symbol
+
+    @contextmanager
+    def lock(self, symbol: str):
+        """Exclusive access to symbol's files, across threads and processes."""
+        with self._locks_guard:
+            thread_lock = self._locks.setdefault(symbol, threading.Lock())
+        with thread_lock:
+            path = self._dir(symbol)
+            path.mkdir(parents=True, exist_ok=True)
+            with open(path / ".lock", "w") as lock_file:
+                fcntl.flock(lock_file, fcntl.LOCK_EX)
+                try:
+                    yield
+                finally:
+                    fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+    def meta(self, symbol: str) -> dict | None:
+        try:
+            return json.loads((self._dir(symbol) / "meta.json").read_text())
+        except FileNotFoundError:
+            return None
+
+    def _write_meta(self, symbol: str, meta: dict):
+        path = self._dir(symbol) / "meta.json"
+        tmp = path.with_suffix(".tmp")
+        tmp.write_text(json.dumps(meta))
+        os.replace(tmp, path)
+
+    def symbols(self) -> list[str]:
+        return sorted(p.parent.name for p in self.root.glob("*/meta.json"))
+
+    def _file(self, symbol: str, name: str, generation: int) -> Path:
+        # Generation 0 keeps the file names from before rewrites existed
+        suffix = f".{generation}" if generation else ""
+        return self._dir(symbol) / f"{name}{suffix}.bin"
+
+    def _write_columns(
+        self, symbol: str, columns: dict[str, np.ndarray], generation: int, rows: int
+    ):
+        """Write columns after the first `rows` rows of the given generation."""
+        count = len(columns["date"])
+        for name, dtype in PRICE_COLUMNS.items():
+            values = columns.get(name)
+            if values is None:
+                values = np.full(count, np.nan)
+            data = np.ascontiguousarray(values, dtype=dtype)
+            path = self._file(symbol, name, generation)
+            with open(path, "r+b" if rows else "wb") as f:
+                # Drop bytes past the committed length from an interrupted append
+                f.truncate(rows * data.itemsize)
+                f.seek(rows * data.itemsize)
+                f.write(data.tobytes())
+
+    def append(self, symbol: str, columns: dict[str, np.ndarray], **meta) -> int:
+        """Append the rows dated after the stored history; returns how many.
+
+        Call with lock(symbol) held. Extra keyword arguments are merged into
+        the symbol's metadata.
+        """
+        current = self.meta(symbol) or {"rows": 0, "last_date": None}
+        dates = columns["date"]
+        if current["last_date"] is not None:
+            keep = dates > np.datetime64(current["last_date"], "D")
+            columns = {name: values[keep] for name, values in columns.items()}
+            dates = columns["date"]
+        rows = current["rows"]
+        if len(dates):
+            self._write_columns(symbol, columns, current.get("generation", 0), rows)
+            rows += len(dates)
+            current["last_date"] = str(dates[-1])
+        current.update(meta, rows=rows)
+        self._write_meta(symbol, current)
+        return len(dates)
+
+    def rewrite(self, symbol: str, columns: dict[str, np.ndarray], **meta) -> int:
+        """Replace symbol's whole history with columns; returns the row count.
+
+        Call with lock(symbol) held. The new generation only becomes visible
+        when meta.json switches to it, and the old files are removed after.
+        """
+        current = self.meta(symbol) or {}
+        old = current.get("generation", 0)
+        dates = columns["date"]
+        self._write_columns(symbol, columns, old + 1, 0)
+        current.update(
+            meta,
+            rows=len(dates),
+            last_date=str(dates[-1]) if len(dates) else None,
+            generation=old + 1,
+        )
+        self._write_meta(symbol, current)
+        for name in PRICE_COLUMNS:
+            self._file(symbol, name, old).unlink(missing_ok=True)
+        return len(dates)
+
+    def _column(self, symbol: str, meta: dict, name: str) -> np.ndarray:
+        rows = meta["rows"] if meta else 0
+        if rows == 0:
+            return np.empty(0, dtype=PRICE_COLUMNS[name])
+        path = self._file(symbol, name, meta.get("generation", 0))
+        return np.memmap(path, dtype=PRICE_COLUMNS[name], mode="r", shape=(rows,))
+
+    def read(
+        self,
+        symbol: str,
+        start: str | None = None,
+        end: str | None = None,
+        columns: list[str] | None = None,
+    ) -> pd.DataFrame:
+        """Rows with start <= date <= end, indexed by date. Only the requested
+        slice of the requested columns is copied out of the memmaps."""
+        names = [c for c in (columns or PRICE_COLUMNS) if c != "date"]
+        for attempt in range(2):
+            meta = self.meta(symbol)
+            try:
+                dates = self._column(symbol, meta, "date")
+                lo = np.searchsorted(dates, np.datetime64(start, "D")) if start else 0
+                hi = len(dates)
+                if end:
+                    hi = np.searchsorted(dates, np.datetime64(end, "D"), side="right")
+                data = {
+                    name: np.array(self._column(symbol, meta, name)[lo:hi])
+                    for name in names
+                }
+            except FileNotFoundError:
+                # A rewrite removed this generation after meta was read
+                if attempt:
+                    raise
+                continue
+            index = pd.DatetimeIndex(np.array(dates[lo:hi]), name="date")
+            return pd.DataFrame(data, index=index)
+
+    def stats(self) -> dict:
+        symbols = self.symbols()
+        total_bytes = sum(p.stat().st_size for p in self.root.glob("*/*.bin"))
+        return {
+            "symbols": len(symbols),
+            "rows": sum(self.meta(s)["rows"] for s in symbols),
+            "bytes": total_bytes,
+        }
+
+
+PRICE_STORE = PriceSeriesStore()
+_PRICE_POOL = ThreadPoolExecutor(
+    max_workers=PRICE_FETCH_WORKERS, thread_name_prefix="av-prices"
+)
+
+
+def _is_fresh(meta: dict | None) -> bool:
+    return bool(meta) and time.time() < meta.get("expires_at", 0)
+
+
+def _outputsize(last_date: str | None) -> str:
+    """The smallest upstream window that covers everything after last_date."""
+    if last_date is None:
+        return "full"
+    gap = np.busday_count(
+        np.datetime64(last_date, "D"), np.datetime64(time.strftime("%Y-%m-%d"), "D")
+    )
+    return "compact" if gap <= COMPACT_POINTS - COMPACT_MARGIN else "full"
+
+
+def _covers(columns: dict[str, np.ndarray], last_date: str) -> bool:
+    # A compact window must reach back to the day after the stored history
+    dates = columns["date"]
+    if not len(dates):
+        return True
+    first_missing = np.busday_offset(np.datetime64(last_date, "D"), 1, roll="forward")
+    return dates[0] <= first_missing
+
+
+def _has_events(columns: dict[str, np.ndarray], last_date: str | None) -> bool:
+    """Whether a dividend or split falls after last_date, which re-adjusts
+    every earlier adjusted_close upstream."""
+    if last_date is None:
+        return False
+    new = columns["date"] > np.datetime64(last_date, "D")
+    dividends = columns["dividend_amount"][new]
+    splits = columns["split_coefficient"][new]
+    return bool(
+        (np.nan_to_num(dividends) != 0).any()
+        or ((splits != 1) & ~np.isnan(splits)).any()
+    )
+
+
+def ingest_daily_prices(symbol: str, force: bool = False) -> int:
+    """Bring symbol's stored history up to date; returns the rows appended.
+
+    Only the new sessions are fetched where possible (outputsize=compact)
+    and appended; the full history is downloaded once, or again when the
+    gap since the last stored date is wider than a compact window. A new
+    dividend or split re-adjusts the whole upstream adjusted_close series,
+    so then the full history is fetched and the stored one rewritten. The
+    payload goes straight into the columnar store, not api_cache.
+    """
+    with PRICE_STORE.lock(symbol):
+        meta = PRICE_STORE.meta(symbol)
+        if not force and _is_fresh(meta):
+            return 0
+        last_date = meta["last_date"] if meta else None
+        outputsize = _outputsize(last_date)
+        payload = fetch_upstream(PRICE_FUNCTION, symbol, {"outputsize": outputsize})
+        columns = parse_daily_series(payload)
+        if outputsize == "compact" and not _covers(columns, last_date):
+            logger.info("Compact window for %s misses days; fetching full", symbol)
+            outputsize = "full"
+            payload = fetch_upstream(PRICE_FUNCTION, symbol, {"outputsize": outputsize})
+            columns = parse_daily_series(payload)
+        rewrite = _has_events(columns, last_date)
+        if rewrite and outputsize == "compact":
+            outputsize = "full"
+            payload = fetch_upstream(PRICE_FUNCTION, symbol, {"outputsize": outputsize})
+            columns = parse_daily_series(payload)
+        fetched_at = int(time.time())
+        expires_at = TTL_POLICY.expires_at(PRICE_FUNCTION, symbol, None, fetched_at)
+        meta = {
+            "fetched_at": fetched_at,
+            "expires_at": expires_at,
+            "last_outputsize": outputsize,
+            "last_fetched_rows": len(columns["date"]),
+        }
+        if rewrite:
+            logger.info("Dividend or split for %s; rewriting its history", symbol)
+            PRICE_STORE.rewrite(symbol, columns, adjusted_at=fetched_at, **meta)
+            return int((columns["date"] > np.datetime64(last_date, "D")).sum())
+        return PRICE_STORE.append(symbol, columns, **meta)
+
+
+def get_daily_prices(
+    symbol: str,
+    start: str | None = None,
+    end: str | None = None,
+    columns: list[str] | None = None,
+) -> pd.DataFrame:
+    """Daily adjusted prices for symbol between start and end (ISO dates,
+    inclusive), refreshing the stored history first if it has expired.
+    If the refresh fails, whatever history is stored is returned."""
+    try:
+        ingest_daily_prices(symbol)
+    except Exception:
+        if not PRICE_STORE.meta(symbol):
+            raise
+        logger.warning("Price refresh for %s failed; serving stored history", symbol)
+    return PRICE_STORE.read(symbol, start, end, columns)
+
+
+def get_daily_prices_many(
+    symbols: list[str],
+    start: str | None = None,
+    end: str | None = None,
+    columns: list[str] | None = None,
+    max_workers: int | None = None,
+) -> dict[str, pd.DataFrame | Exception]:
+    """get_daily_prices for many symbols; failures are returned in place."""
+    symbols = list(dict.fromkeys(symbols))
+    results = run_per_symbol(
+        lambda symbol: get_daily_prices(symbol, start, end, columns),
+        symbols,
+        max_workers,
+        pool=_PRICE_POOL,
+    )
+    return dict(zip(symbols, results))
@@ -0,0 +1,262 @@
+"""Local stand-in for the Alpha Vantage query endpoint.
+
+Serves recorded responses from a directory (<FUNCTION>/<SYMBOL>.json) or
+synthetic ones from fixtures.py, and emulates the ways the real API pushes
+back: per-minute and per-day quotas answered with a "Note"/"Information"
+body or an HTTP 429, random 429s and slow responses. Point the client at it
+with ALPHAVANTAGE_BASE_URL=http://127.0.0.1:8901/query.
+
+    python standin_server.py --port 8901 --per-minute 5 --latency 0.2
+"""
+
+import json
+import time
+import random
+import logging
+import argparse
+import threading
+from collections import deque
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from urllib.parse import parse_qs, urlparse
+from fixtures import FIXTURE_SEED, generate
+
+logger = logging.getLogger(__name__)
+
+NOTE_BODY = {
+    "Note": "Thank you for using Alpha Vantage! Our standard API call frequency "
+    "is 5 calls per minute and 25 calls per day. Please visit "
+    "https://www.alphavantage.co/premium/ if you would like to target a higher "
+    "API call frequency."
+}
+DAILY_LIMIT_BODY = {
+    "Information": "Thank you for using Alpha Vantage! Our standard API rate "
+    "limit is 25 requests per day. Please subscribe to any of the premium "
+    "plans at https://www.alphavantage.co/premium/ to instantly remove all "
+    "daily rate limits."
+}
+ERROR_BODY = {
+    "Error Message": "Invalid API call. Please retry or visit the documentation "
+    "(https://www.alphavantage.co/documentation/) for this function."
+}
+
+
+class StandInServer:
+    """Threaded HTTP server answering /query like Alpha Vantage.
+
+    Quotas are counted per apikey. quota_response picks how an exhausted
+    quota is answered: "note" (HTTP 200 with a Note/Information body, as the
+    real API does) or "429" (with Retry-After). throttle_rate adds random
+    429s on top, and every response waits latency +/- latency_jitter seconds.
+    GET /stats returns the counters and GET /reset clears them.
+    """
+
+    def __init__(
+        self,
+        host: str = "127.0.0.1",
+        port: int = 8901,
+        recorded_dir: Path | None = None,
+        synthetic: bool = True,
+        per_minute: int = 5,
+        per_day: int = 0,
+        quota_response: str = "note",
+        throttle_rate: float = 0.0,
+        latency: float = 0.0,
+        latency_jitter: float = 0.0,
+        seed: int = FIXTURE_SEED,
+    ):
+        self.recorded_dir = Path(recorded_dir) if recorded_dir else None
+        self.synthetic = synthetic
+        self.per_minute = per_minute
+        self.per_day = per_day
+        self.quota_response = quota_response
+        self.throttle_rate = throttle_rate
+        self.latency = latency
+        self.latency_jitter = latency_jitter
+        self.seed = seed
+        self._rng = random.Random(seed)
+        self._lock = threading.Lock()
+        self._minute: dict[str, deque] = {}
+        self._day: dict[str, deque] = {}
+        self._counts: dict[str, int] = {}
+        self._thread: threading.Thread | None = None
+        self.httpd = ThreadingHTTPServer((host, port), self._handler())
+        self.httpd.daemon_threads = True
+
+    @property
+    def url(self) -> str:
+        host, port = self.httpd.server_address[:2]
+        return f"http://{host}:{port}/query"
+
+    def _count(self, outcome: str):
+        self._counts[outcome] = self._counts.get(outcome, 0) + 1
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "counts": dict(self._counts),
+                "per_minute": self.per_minute,
+                "per_day": self.per_day,
+                "quota_response": self.quota_response,
+                "throttle_rate": self.throttle_rate,
+                "latency": self.latency,
+            }
+
+    def reset(self):
+        with self._lock:
+            self._minute.clear()
+            self._day.clear()
+            self._counts.clear()
+
+    def _over_quota(self, apikey: str) -> str | None:
+        """Record a call for apikey; returns "minute" or "day" if it is over."""
+        now = time.monotonic()
+        with self._lock:
+            for name, limit, window, calls in (
+                ("day", self.per_day, 86400, self._day),
+                ("minute", self.per_minute, 60, self._minute),
+            ):
+                if not limit:
+                    continue
+                recent = calls.setdefault(apikey, deque())
+                while recent and recent[0] <= now - window:
+                    recent.popleft()
+                if len(recent) >= limit:
+                    return name
+            for limit, calls in (
+                (self.per_day, self._day),
+                (self.per_minute, self._minute),
+            ):
+                if limit:
+                    calls[apikey].append(now)
+        return None
+
+    def _payload(self, params: dict) -> dict:
+        function, symbol = params.get("function", ""), params.get("symbol", "")
+        if self.recorded_dir is not None:
+            path = self.recorded_dir / function / f"{symbol}.json"
+            if path.exists():
+                return json.loads(path.read_text())
+        payload = generate(function, symbol, self.seed, params) if self.synthetic else None
+        return ERROR_BODY if payload is None else payload
+
+    def respond(self, params: dict) -> tuple[int, dict, dict]:
+        """(status, headers, body) for one /query call."""
+        with self._lock:
+            throttled = self._rng.random() < self.throttle_rate
+            delay = self.latency * (
+                1 + self._rng.uniform(-self.latency_jitter, self.latency_jitter)
+            )
+        if delay > 0:
+            time.sleep(delay)
+        if throttled:
+            with self._lock:
+                self._count("429")
+            return 429, {"Retry-After": "1"}, {"Note": "Too Many Requests"}
+
+        over = self._over_quota(params.get("apikey", ""))
+        if over is not None:
+            with self._lock:
+                self._count(f"over_{over}")
+            if self.quota_response == "429":
+                retry_after = "60" if over == "minute" else "3600"
+                return 429, {"Retry-After": retry_after}, {"Note": "Too Many Requests"}
+            return 200, {}, NOTE_BODY if over == "minute" else DAILY_LIMIT_BODY
+
+        body = self._payload(params)
+        with self._lock:
+            self._count("error" if body is ERROR_BODY else "ok")
+        return 200, {}, body
+
+    def _handler(self):
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                url = urlparse(self.path)
+                if url.path == "/query":
+                    params = {k: v[-1] for k, v in parse_qs(url.query).items()}
+                    status, headers, body = server.respond(params)
+                elif url.path == "/stats":
+                    status, headers, body = 200, {}, server.stats()
+                elif url.path == "/reset":
+                    server.reset()
+                    status, headers, body = 200, {}, {"reset": True}
+                else:
+                    status, headers, body = 404, {}, {"error": "not found"}
+                data = json.dumps(body).encode()
+                self.send_response(status)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(data)))
+                for name, value in headers.items():
+                    self.send_header(name, value)
+                self.end_headers()
+                self.wfile.write(data)
+
+            def log_message(self, format, *args):
+                logger.debug("%s - %s", self.address_string(), format % args)
+
+        return Handler
+
+    def start(self) -> str:
+        """Serve in a background thread; returns the /query URL."""
+        self._thread = threading.Thread(
+            target=self.httpd.serve_forever, name="standin-server", daemon=True
+        )
+        self._thread.start()
+        return self.url
+
+    def stop(self):
+        self.httpd.shutdown()
+        self.httpd.server_close()
+        if self._thread:
+            self._thread.join()
+
+    def __enter__(self):
+        self.start()
+        return self
+
+    def __exit__(self, *exc):
+        self.stop()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8901)
+    parser.add_argument("--recorded-dir", type=Path)
+    parser.add_argument("--no-synthetic", action="store_true")
+    parser.add_argument("--per-minute", type=int, default=5)
+    parser.add_argument("--per-day", type=int, default=0)
+    parser.add_argument("--quota-response", choices=["note", "429"], default="note")
+    parser.add_argument("--throttle-rate", type=float, default=0.0)
+    parser.add_argument("--latency", type=float, default=0.0)
+    parser.add_argument("--latency-jitter", type=float, default=0.0)
+    parser.add_argument("--seed", type=int, default=FIXTURE_SEED)
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO)
+    server = StandInServer(
+        host=args.host,
+        port=args.port,
+        recorded_dir=args.recorded_dir,
+        synthetic=not args.no_synthetic,
+        per_minute=args.per_minute,
+        per_day=args.per_day,
+        quota_response=args.quota_response,
+        throttle_rate=args.throttle_rate,
+        latency=args.latency,
+        latency_jitter=args.latency_jitter,
+        seed=args.seed,
+    )
+    logger.info("Alpha Vantage stand-in serving on %s", server.url)
+    try:
+        server.httpd.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.httpd.server_close()
+
+
+if __name__ == "__main__":
+    main()
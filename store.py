@@ -0,0 +1,215 @@
+import os
+import time
+import logging
+import threading
+from dataclasses import dataclass
+from functools import cached_property
+import numpy as np
+import pandas as pd
+from client import (
+    cache_digests,
+    cache_get_many,
+    get_company_overview_records,
+    parsed_record,
+    subscribe_cache_changes,
+    unsubscribe_cache_changes,
+)
+from metrics import with_metrics
+from parsers import overview_frame
+
+logger = logging.getLogger(__name__)
+
+# Seconds between checks of the shared cache for entries another process
+# rewrote; change events only reach listeners in the writing process
+STORE_RECONCILE_INTERVAL = float(os.getenv("STORE_RECONCILE_INTERVAL", "30"))
+
+
+@dataclass(frozen=True)
+class Snapshot:
+    """One version of the vendor overview frame.
+
+    The frame is shared by every reader of this version and must not be
+    mutated; upserts publish a new Snapshot instead.
+    """
+
+    version: int
+    frame: pd.DataFrame
+
+    @cached_property
+    def view(self) -> pd.DataFrame:
+        """The frame with every numeric column as float64, for the chart and
+        table builders. Built on first use and shared by every reader of this
+        version, so builders select the columns they need instead of copying
+        and coercing the frame on each callback."""
+        numeric = self.frame.select_dtypes("number").columns
+        return self.frame.astype({c: np.float64 for c in numeric}, copy=False)
+
+
+class VendorStore:
+    """Owns the typed vendor overview frame for a set of symbols.
+
+    Rows are upserted one symbol at a time when the symbol's OVERVIEW cache
+    entry changes, so a refresh never re-parses or rebuilds the other rows.
+    The derived metrics columns are recomputed over the whole frame on each
+    change, since some compare a row with the rest of the universe. Entries
+    rewritten by other processes are picked up by reconcile().
+    """
+
+    def __init__(self, symbols: list[str] = ()):
+        self._symbols: dict[str, None] = dict.fromkeys(symbols)
+        self._lock = threading.Lock()
+        self._snapshot = Snapshot(0, with_metrics(overview_frame([])))
+        self._errors: dict[str, str] = {}
+        # Symbols a load() is fetching; it upserts them in one batch at the end
+        # and then applies the changes published meanwhile, held in _deferred
+        self._loading: set[str] = set()
+        self._deferred: dict[str, dict] = {}
+        self._deferred_lock = threading.Lock()
+        # Digest of the cache entry each row was built from, for reconcile()
+        self._digests: dict[str, str] = {}
+        self._reconcile_lock = threading.Lock()
+        self._reconciled_at = float("-inf")
+        subscribe_cache_changes(self._on_cache_change)
+
+    @property
+    def symbols(self) -> list[str]:
+        return list(self._symbols)
+
+    @property
+    def version(self) -> int:
+        return self._snapshot.version
+
+    def snapshot(self) -> Snapshot:
+        """The current snapshot; reading it takes no lock and copies nothing."""
+        return self._snapshot
+
+    def load(self, symbols: list[str] | None = None) -> Snapshot:
+        """Fetch (mostly from cache) and upsert the given or all watched symbols."""
+        if symbols is not None:
+            self._symbols.update(dict.fromkeys(symbols))
+        symbols = list(symbols if symbols is not None else self._symbols)
+        with self._deferred_lock:
+            self._loading.update(symbols)
+        # Read before the fetch, so a rewrite racing it leaves a mismatch for
+        # reconcile() instead of being recorded as already applied
+        digests = cache_digests("OVERVIEW", symbols)
+        try:
+            results = get_company_overview_records(symbols)
+            records = {}
+            for symbol, record in zip(symbols, results):
+                if isinstance(record, Exception):
+                    self._errors[symbol] = str(record)
+                    logger.warning("No overview for %s: %s", symbol, record)
+                else:
+                    records[symbol] = record
+            self.upsert_many(records, {s: digests.get(s) for s in records})
+        finally:
+            # Changes published during the fetch are at least as new as what it
+            # read; applying them under the lock keeps later ones from racing ahead
+            with self._deferred_lock:
+                self._loading.difference_update(symbols)
+                deferred = {
+                    symbol: self._deferred.pop(symbol)
+                    for symbol in symbols
+                    if symbol in self._deferred
+                }
+                self.upsert_many(
+                    {
+                        symbol: parsed_record("OVERVIEW", entry["data"], entry["digest"])
+                        for symbol, entry in deferred.items()
+                    },
+                    {symbol: entry["digest"] for symbol, entry in deferred.items()},
+                )
+        return self._snapshot
+
+    def reconcile(self, force: bool = False) -> Snapshot:
+        """Upsert watched symbols whose shared cache entry no longer matches
+        the row, at most once per STORE_RECONCILE_INTERVAL unless forced.
+
+        Only digests are read for the unchanged symbols, so this is one
+        cheap backend round trip when nothing moved.
+        """
+        if not self._reconcile_lock.acquire(blocking=force):
+            return self._snapshot
+        try:
+            now = time.monotonic()
+            if not force and now - self._reconciled_at < STORE_RECONCILE_INTERVAL:
+                return self._snapshot
+            self._reconciled_at = now
+            with self._deferred_lock:
+                symbols = [s for s in self._symbols if s not in self._loading]
+            stored = cache_digests("OVERVIEW", symbols)
+            changed = [s for s, d in stored.items() if d != self._digests.get(s)]
+            if not changed:
+                return self._snapshot
+            entries = cache_get_many("OVERVIEW", changed, use_memory=False)
+            logger.info("Reconciling %d rows changed elsewhere", len(entries))
+            return self.upsert_many(
+                {
+                    symbol: parsed_record("OVERVIEW", entry["data"], entry["digest"])
+                    for symbol, entry in entries.items()
+                },
+                {symbol: entry["digest"] for symbol, entry in entries.items()},
+            )
+        finally:
+            self._reconcile_lock.release()
+
+    def upsert(self, symbol: str, record: dict) -> Snapshot:
+        return self.upsert_many({symbol: record})
+
+    def upsert_many(
+        self, records: dict[str, dict], digests: dict[str, str | None] | None = None
+    ) -> Snapshot:
+        """Replace or append the rows for records' symbols and publish the
+        result as a new version. digests are the cache entries' digests the
+        records were parsed from, where known."""
+        if not records:
+            return self._snapshot
+        rows = overview_frame(list(records.values())).set_axis(list(records))
+        with self._lock:
+            current = self._snapshot.frame
+            kept = current.drop(index=[s for s in records if s in current.index])
+            frame = rows if kept.empty else pd.concat([kept, rows])
+            # Watched symbols keep their order; anything else goes last
+            order = [s for s in self._symbols if s in frame.index]
+            order += [s for s in frame.index if s not in self._symbols]
+            frame = with_metrics(frame.reindex(order))
+            for symbol in records:
+                self._errors.pop(symbol, None)
+                self._digests[symbol] = (digests or {}).get(symbol)
+            self._snapshot = Snapshot(self._snapshot.version + 1, frame)
+            return self._snapshot
+
+    def remove(self, symbols: list[str]) -> Snapshot:
+        with self._lock:
+            for symbol in symbols:
+                self._symbols.pop(symbol, None)
+                self._digests.pop(symbol, None)
+            frame = self._snapshot.frame
+            frame = frame.drop(index=[s for s in symbols if s in frame.index])
+            frame = with_metrics(frame)
+            self._snapshot = Snapshot(self._snapshot.version + 1, frame)
+            return self._snapshot
+
+    def _on_cache_change(self, function: str, symbol: str, ph: str, entry: dict):
+        # Only the default-parameter OVERVIEW entry feeds the frame
+        if function != "OVERVIEW" or ph != "_" or symbol not in self._symbols:
+            return
+        with self._deferred_lock:
+            if symbol in self._loading:
+                self._deferred[symbol] = entry
+                return
+        record = parsed_record(function, entry["data"], entry["digest"])
+        self.upsert_many({symbol: record}, {symbol: entry["digest"]})
+
+    def close(self):
+        unsubscribe_cache_changes(self._on_cache_change)
+
+    def status(self) -> dict:
+        snapshot = self._snapshot
+        return {
+            "version": snapshot.version,
+            "rows": len(snapshot.frame),
+            "symbols": self.symbols,
+            "errors": dict(self._errors),
+        }
@@ -0,0 +1,13 @@
+import os
+import sys
+import tempfile
+from pathlib import Path
+
+# client.py builds its cache and provider at import, so point them at a
+# throwaway directory and the offline fixtures before anything imports it
+os.environ["CACHE_DIR"] = tempfile.mkdtemp(prefix="vendor_cache_test_")
+os.environ["CACHE_BACKEND"] = "sqlite"
+os.environ["DATA_PROVIDER"] = "fixtures"
+os.environ["FIXTURE_LATENCY"] = "0"
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
@@ -0,0 +1,93 @@
+import json
+import sqlite3
+import pytest
+from cache_backends import _MIGRATIONS, SqliteBackend, decode_payload
+
+V0_SCHEMA = """
+CREATE TABLE api_cache (
+    function TEXT,
+    symbol   TEXT,
+    params_hash TEXT,
+    response TEXT,
+    timestamp INTEGER,
+    PRIMARY KEY (function, symbol, params_hash)
+)
+"""
+PAYLOAD = {"Symbol": "IBM", "Name": "International Business Machines"}
+KEY = ("OVERVIEW", "IBM", "_")
+
+
+def make_v0_cache(path, rows):
+    conn = sqlite3.connect(path)
+    conn.execute(V0_SCHEMA)
+    conn.executemany("INSERT INTO api_cache VALUES (?, ?, ?, ?, ?)", rows)
+    conn.commit()
+    conn.close()
+
+
+@pytest.fixture
+def migrated(tmp_path):
+    """A v0 cache with one good and one unreadable row, opened (and so
+    migrated) by the current backend."""
+    path = tmp_path / "cache.sqlite"
+    make_v0_cache(
+        path,
+        [
+            (*KEY, json.dumps(PAYLOAD), 1_000),
+            ("OVERVIEW", "BAD", "_", "{not json", 1_000),
+        ],
+    )
+    return SqliteBackend(path, default_ttl=lambda function: 500)
+
+
+def test_v1_moves_json_text_into_encoded_payloads(migrated):
+    blob, ts, _, _ = migrated.get(KEY)
+    assert decode_payload(blob) == PAYLOAD
+    assert ts == 1_000
+    conn = migrated.conn()
+    assert conn.execute("SELECT response FROM api_cache").fetchall() == [(None,)]
+    # Unreadable rows are dropped rather than migrated
+    assert migrated.get(("OVERVIEW", "BAD", "_")) is None
+    assert migrated.stats()["rows"] == 1
+
+
+def test_v2_starts_last_access_at_the_fetch_time(migrated):
+    meta = migrated.metadata_many([KEY])[KEY]
+    assert meta["last_access"] == 1_000
+
+
+def test_v3_backfills_expiry_size_and_hits(migrated):
+    blob, ts, expires, _ = migrated.get(KEY)
+    assert expires == ts + 500
+    meta = migrated.metadata_many([KEY])[KEY]
+    assert meta["payload_size"] == len(blob)
+    assert meta["hit_count"] == 0
+    indexes = {
+        row[1] for row in migrated.conn().execute("PRAGMA index_list(api_cache)")
+    }
+    assert {"idx_api_cache_last_access", "idx_api_cache_expires_at"} <= indexes
+
+
+def test_v4_adds_an_empty_content_hash(migrated):
+    conn = migrated.conn()
+    assert conn.execute("PRAGMA user_version").fetchone()[0] == len(_MIGRATIONS) == 4
+    columns = {row[1] for row in conn.execute("PRAGMA table_info(api_cache)")}
+    assert "content_hash" in columns
+    # Unknown until the next refresh, which then counts as a change
+    assert migrated.get(KEY)[3] is None
+
+
+def test_migrations_run_once(tmp_path):
+    path = tmp_path / "cache.sqlite"
+    make_v0_cache(path, [(*KEY, "{}", 1_000)])
+    SqliteBackend(path)
+    # Re-opening an up-to-date cache must not re-run ALTER TABLE
+    backend = SqliteBackend(path)
+    assert backend.conn().execute("PRAGMA user_version").fetchone()[0] == 4
+    assert backend.get(KEY) is not None
+
+
+def test_new_cache_starts_at_the_current_version(tmp_path):
+    backend = SqliteBackend(tmp_path / "cache.sqlite")
+    assert backend.conn().execute("PRAGMA user_version").fetchone()[0] == 4
+    assert backend.stats()["rows"] == 0
@@ -0,0 +1,42 @@
+import json
+import pandas as pd
+import pytest
+from components import charts
+from components.charts import FIGURE_CACHE, bar_chart_figure, cached_figure
+from store import Snapshot
+
+
+@pytest.fixture
+def counted_build():
+    calls = []
+
+    def build(df, *fields):
+        calls.append(fields)
+        return bar_chart_figure(df, *fields)
+
+    FIGURE_CACHE.clear()
+    build.calls = calls
+    return build
+
+
+def snapshot(version, revenue):
+    frame = pd.DataFrame({"Symbol": ["A", "B"], "RevenueTTM": revenue})
+    return Snapshot(version, frame)
+
+
+def test_repeat_selection_is_served_from_the_cache(counted_build):
+    first = cached_figure(snapshot(1, [1.0, 2.0]), "bar", counted_build, "RevenueTTM")
+    again = cached_figure(snapshot(1, [1.0, 2.0]), "bar", counted_build, "RevenueTTM")
+    assert again is first
+    assert counted_build.calls == [("RevenueTTM",)]
+    # Plain JSON-ready data, not numpy arrays
+    assert json.loads(json.dumps(first)) == first
+
+
+def test_new_version_or_selection_is_rebuilt(counted_build):
+    old = cached_figure(snapshot(1, [1.0, 2.0]), "bar", counted_build, "RevenueTTM")
+    new = cached_figure(snapshot(2, [3.0, 4.0]), "bar", counted_build, "RevenueTTM")
+    assert new["data"][0]["y"] != old["data"][0]["y"]
+    cached_figure(snapshot(2, [3.0, 4.0]), "other", counted_build, "RevenueTTM")
+    assert len(counted_build.calls) == 3
+    assert charts.FIGURE_CACHE.stats()["entries"] == 3
@@ -0,0 +1,102 @@
+import threading
+import time
+import pytest
+import client
+from cache_backends import LmdbBackend, RedisBackend, SqliteBackend
+
+KEY = ("OVERVIEW", "IBM", "_")
+
+
+@pytest.fixture(params=["sqlite", "lmdb", "redis"])
+def backend(request, tmp_path):
+    if request.param == "sqlite":
+        return SqliteBackend(tmp_path / "cache.sqlite")
+    if request.param == "lmdb":
+        pytest.importorskip("lmdb")
+        return LmdbBackend(tmp_path / "cache.lmdb", map_size=16 * 1024 * 1024)
+    fakeredis = pytest.importorskip("fakeredis")
+    return RedisBackend(client=fakeredis.FakeRedis())
+
+
+def test_lease_is_exclusive_until_released(backend):
+    assert backend.acquire_lease(KEY, "a", ttl=30)
+    assert not backend.acquire_lease(KEY, "b", ttl=30)
+    backend.release_lease(KEY, "a")
+    assert backend.acquire_lease(KEY, "b", ttl=30)
+
+
+def test_expired_lease_is_taken_over(backend):
+    assert backend.acquire_lease(KEY, "a", ttl=0.1)
+    time.sleep(0.2)
+    assert backend.acquire_lease(KEY, "b", ttl=30)
+    # The old owner finishing late must not release the new owner's lease
+    backend.release_lease(KEY, "a")
+    assert not backend.acquire_lease(KEY, "c", ttl=30)
+
+
+@pytest.fixture
+def fresh_key():
+    client.MEMORY_CACHE.clear()
+    key = ("OVERVIEW", f"L{time.monotonic_ns()}", "_")
+    yield key
+    client.CACHE.release_lease(key, "other-process")
+
+
+def test_waiter_picks_up_the_lease_holders_result(fresh_key, monkeypatch):
+    function, symbol, _ = fresh_key
+    assert client.CACHE.acquire_lease(fresh_key, "other-process", 30)
+
+    def upstream(*args):
+        raise AssertionError("waiter must not fetch while another process holds the lease")
+
+    monkeypatch.setattr(client, "_fetch_and_store", upstream)
+
+    def other_process():
+        time.sleep(0.3)
+        client.cache_set(function, symbol, None, {"Symbol": symbol})
+
+    writer = threading.Thread(target=other_process)
+    writer.start()
+    entry = client._leased_fetch(fresh_key, {})
+    writer.join()
+    assert entry["data"] == {"Symbol": symbol}
+
+
+def test_waiter_fetches_once_the_lease_expires(fresh_key, monkeypatch):
+    function, symbol, _ = fresh_key
+    assert client.CACHE.acquire_lease(fresh_key, "other-process", 0.3)
+    calls = []
+
+    def upstream(function, symbol, params_extra):
+        calls.append(symbol)
+        return client.cache_set(function, symbol, params_extra, {"Symbol": symbol})
+
+    monkeypatch.setattr(client, "_fetch_and_store", upstream)
+    entry = client._leased_fetch(fresh_key, {})
+    assert calls == [symbol]
+    assert entry["data"] == {"Symbol": symbol}
+
+
+def test_single_flight_shares_one_fetch(fresh_key, monkeypatch):
+    function, symbol, _ = fresh_key
+    calls = []
+
+    def upstream(function, symbol, params_extra=None):
+        calls.append(symbol)
+        time.sleep(0.2)
+        return {"Symbol": symbol}
+
+    monkeypatch.setattr(client, "fetch_upstream", upstream)
+    results = []
+    threads = [
+        threading.Thread(
+            target=lambda: results.append(client._cached_api_result(function, symbol))
+        )
+        for _ in range(8)
+    ]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert calls == [symbol]
+    assert [r.data for r in results] == [{"Symbol": symbol}] * 8
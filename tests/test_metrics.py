@@ -0,0 +1,63 @@
+import numpy as np
+import pandas as pd
+import pytest
+from metrics import METRICS, compute_metrics, with_metrics
+
+
+@pytest.fixture
+def frame():
+    return pd.DataFrame(
+        {
+            "Sector": ["TECH", "TECH", "TECH", "ENERGY"],
+            "EVToRevenue": [2.0, 3.0, 1.0, 4.0],
+            "RevenueTTM": [100.0, 200.0, 0.0, 50.0],
+            "EBITDA": [20.0, -10.0, 5.0, 0.0],
+            "GrossProfitTTM": [40.0, 50.0, 1.0, 10.0],
+            "PERatio": [10.0, 20.0, -5.0, 8.0],
+            "AnalystRatingStrongBuy": [2.0, 0.0, np.nan, 0.0],
+            "AnalystRatingBuy": [1.0, 0.0, np.nan, 0.0],
+            "AnalystRatingHold": [1.0, 0.0, np.nan, 0.0],
+            "AnalystRatingSell": [0.0, 0.0, np.nan, 0.0],
+            "AnalystRatingStrongSell": [0.0, 0.0, np.nan, 0.0],
+        },
+        index=["A", "B", "C", "D"],
+    )
+
+
+def test_values(frame):
+    result = compute_metrics(frame)
+    assert result.loc["A", "EnterpriseValue"] == 200.0
+    assert result.loc["A", "EVToEBITDADerived"] == 10.0
+    assert result.loc["A", "GrossMarginTTM"] == 0.4
+    assert result.loc["A", "EarningsYield"] == 0.1
+    # (2 * 5 + 1 * 4 + 1 * 3) / 4 ratings
+    assert result.loc["A", "AnalystConsensusScore"] == pytest.approx(17 / 4)
+    assert result.loc["A", "AnalystBuyShare"] == 0.75
+    assert result.loc["A", "AnalystRatingCount"] == 4.0
+    # TECH median of the positive P/Es is 15
+    assert result.loc["A", "SectorRelativePE"] == pytest.approx(10 / 15)
+    assert result.loc["D", "SectorRelativePE"] == 1.0
+
+
+def test_nan_guards(frame):
+    result = compute_metrics(frame)
+    # Negative or zero EBITDA, zero revenue, negative P/E
+    assert np.isnan(result.loc["B", "EVToEBITDADerived"])
+    assert np.isnan(result.loc["D", "EVToEBITDADerived"])
+    assert np.isnan(result.loc["C", "GrossMarginTTM"])
+    assert np.isnan(result.loc["C", "EarningsYield"])
+    assert np.isnan(result.loc["C", "SectorRelativePE"])
+    # All ratings zero, or none reported
+    assert np.isnan(result.loc["B", "AnalystConsensusScore"])
+    assert result.loc["B", "AnalystRatingCount"] == 0.0
+    assert np.isnan(result.loc["C", "AnalystRatingCount"])
+    # Columns OVERVIEW did not send come out as NaN, not errors
+    assert result["OffHigh52Week"].isna().all()
+
+
+def test_every_metric_is_a_float64_column(frame):
+    result = with_metrics(frame)
+    assert list(result.columns[-len(METRICS):]) == list(METRICS)
+    assert (result[list(METRICS)].dtypes == np.float64).all()
+    # Recomputing replaces the columns instead of adding a second copy
+    assert list(with_metrics(result).columns) == list(result.columns)
@@ -0,0 +1,24 @@
+import numpy as np
+from parsers import overview_frame, parse_overview
+
+
+def test_fractional_integer_field_stays_float64():
+    records = [
+        parse_overview({"Symbol": "A", "EBITDA": "1000", "SharesOutstanding": "10"}),
+        parse_overview({"Symbol": "B", "EBITDA": "2500.5", "SharesOutstanding": "20"}),
+    ]
+    frame = overview_frame(records)
+    assert frame["EBITDA"].dtype == np.float64
+    assert frame["EBITDA"].tolist() == [1000.0, 2500.5]
+    assert frame["SharesOutstanding"].dtype == np.int64
+
+
+def test_integer_field_with_gaps_becomes_float64():
+    records = [
+        parse_overview({"Symbol": "A", "EBITDA": "123.0"}),
+        parse_overview({"Symbol": "B", "EBITDA": "None"}),
+    ]
+    frame = overview_frame(records)
+    assert frame["EBITDA"].dtype == np.float64
+    assert frame["EBITDA"].iloc[0] == 123.0
+    assert np.isnan(frame["EBITDA"].iloc[1])
@@ -0,0 +1,144 @@
+import time
+import numpy as np
+import pytest
+import prices
+from prices import PriceSeriesStore
+
+
+class Upstream:
+    """A daily series ending today, published up to `visible` sessions.
+
+    adjusted_close is close less every later dividend, so a new dividend
+    changes the whole adjusted history the way the real endpoint does.
+    """
+
+    def __init__(self, sessions, compact_points=prices.COMPACT_POINTS):
+        today = np.datetime64(time.strftime("%Y-%m-%d"), "D")
+        offsets = np.arange(-sessions + 1, 1)
+        self.dates = np.busday_offset(today, offsets, roll="backward")
+        self.close = np.linspace(100.0, 150.0, sessions)
+        self.dividends = np.zeros(sessions)
+        self.compact_points = compact_points
+        self.visible = sessions
+        self.calls = []
+
+    def adjusted(self):
+        dividends = self.dividends[: self.visible]
+        later = dividends[::-1].cumsum()[::-1] - dividends
+        return self.close[: self.visible] - later
+
+    def __call__(self, function, symbol, params):
+        self.calls.append(params["outputsize"])
+        first = 0
+        if params["outputsize"] == "compact":
+            first = max(0, self.visible - self.compact_points)
+        adjusted = self.adjusted()
+        series = {
+            str(self.dates[i]): {
+                "1. open": str(self.close[i]),
+                "4. close": str(self.close[i]),
+                "5. adjusted close": str(adjusted[i]),
+                "7. dividend amount": str(self.dividends[i]),
+                "8. split coefficient": "1.0",
+            }
+            for i in range(first, self.visible)
+        }
+        return {"Time Series (Daily)": series}
+
+
+@pytest.fixture
+def store(tmp_path, monkeypatch):
+    store = PriceSeriesStore(tmp_path)
+    monkeypatch.setattr(prices, "PRICE_STORE", store)
+    return store
+
+
+def serve(monkeypatch, upstream):
+    monkeypatch.setattr(prices, "fetch_upstream", upstream)
+    return upstream
+
+
+def test_first_ingest_downloads_the_full_history(store, monkeypatch):
+    upstream = serve(monkeypatch, Upstream(150))
+    assert prices.ingest_daily_prices("IBM") == 150
+    assert upstream.calls == ["full"]
+    assert store.meta("IBM")["last_outputsize"] == "full"
+
+
+def test_short_gap_is_appended_from_compact(store, monkeypatch):
+    upstream = serve(monkeypatch, Upstream(150))
+    upstream.visible = 140
+    prices.ingest_daily_prices("IBM")
+    upstream.visible = 150
+    assert prices.ingest_daily_prices("IBM", force=True) == 10
+    assert upstream.calls == ["full", "compact"]
+    frame = store.read("IBM")
+    assert len(frame) == 150
+    np.testing.assert_allclose(frame["close"].to_numpy(), upstream.close)
+
+
+def test_gap_wider_than_compact_fetches_full(store, monkeypatch):
+    upstream = serve(monkeypatch, Upstream(300))
+    upstream.visible = 100
+    prices.ingest_daily_prices("IBM")
+    upstream.visible = 300
+    assert prices.ingest_daily_prices("IBM", force=True) == 200
+    assert upstream.calls == ["full", "full"]
+
+
+def test_compact_window_that_misses_days_falls_back_to_full(store, monkeypatch):
+    # A compact response shorter than the gap (holidays, a short listing)
+    upstream = serve(monkeypatch, Upstream(150, compact_points=3))
+    upstream.visible = 140
+    prices.ingest_daily_prices("IBM")
+    upstream.visible = 150
+    assert prices.ingest_daily_prices("IBM", force=True) == 10
+    assert upstream.calls == ["full", "compact", "full"]
+    assert len(store.read("IBM")) == 150
+
+
+def test_dividend_in_compact_append_rewrites_adjusted_history(store, monkeypatch):
+    upstream = serve(monkeypatch, Upstream(150))
+    upstream.visible = 140
+    prices.ingest_daily_prices("IBM")
+    old_files = sorted(p.name for p in (store.root / "IBM").glob("*.bin"))
+    upstream.dividends[145] = 2.5
+    upstream.visible = 150
+    assert prices.ingest_daily_prices("IBM", force=True) == 10
+    assert upstream.calls == ["full", "compact", "full"]
+    frame = store.read("IBM")
+    np.testing.assert_allclose(frame["adjusted_close"].to_numpy(), upstream.adjusted())
+    assert frame["adjusted_close"].iloc[0] == pytest.approx(100.0 - 2.5)
+    meta = store.meta("IBM")
+    assert meta["generation"] == 1 and meta["rows"] == 150
+    # The previous generation's column files are gone
+    assert not any((store.root / "IBM" / name).exists() for name in old_files)
+
+
+def test_append_without_events_keeps_the_stored_generation(store, monkeypatch):
+    upstream = serve(monkeypatch, Upstream(150))
+    upstream.dividends[10] = 1.0
+    upstream.visible = 140
+    prices.ingest_daily_prices("IBM")
+    upstream.visible = 150
+    prices.ingest_daily_prices("IBM", force=True)
+    assert upstream.calls == ["full", "compact"]
+    assert store.meta("IBM").get("generation", 0) == 0
+
+
+def test_append_after_interrupted_write_drops_uncommitted_bytes(store, monkeypatch):
+    upstream = serve(monkeypatch, Upstream(150))
+    upstream.visible = 140
+    prices.ingest_daily_prices("IBM")
+    # A crash after writing column bytes but before meta.json was replaced
+    for path in (store.root / "IBM").glob("*.bin"):
+        with open(path, "ab") as f:
+            f.write(b"\xff" * 8 * 7)
+    assert len(store.read("IBM")) == 140
+    upstream.visible = 150
+    prices.ingest_daily_prices("IBM", force=True)
+    frame = store.read("IBM")
+    np.testing.assert_allclose(frame["close"].to_numpy(), upstream.close)
+    assert frame.index.is_monotonic_increasing
+    for path in (store.root / "IBM").glob("*.bin"):
+        assert path.stat().st_size == 150 * 8
@@ -0,0 +1,52 @@
+import threading
+import pytest
+from client import RateLimiter, RateLimitExceeded
+
+
+def drained(per_minute=60):
+    limiter = RateLimiter(per_minute=per_minute)
+    for _ in range(per_minute):
+        assert limiter.reserve() == 0
+    return limiter
+
+
+def test_reservations_are_handed_out_in_call_order():
+    limiter = drained()  # refills one slot per second
+    waits = [limiter.reserve() for _ in range(3)]
+    assert waits == pytest.approx([1, 2, 3], abs=0.05)
+
+
+def test_refused_reservation_does_not_claim_a_slot():
+    limiter = drained()
+    assert limiter.reserve() == pytest.approx(1, abs=0.05)
+    with pytest.raises(RateLimitExceeded) as exc:
+        limiter.reserve(max_wait=0.5)
+    assert exc.value.retry_after == pytest.approx(2, abs=0.05)
+    # The refused caller left the slot for the next one
+    assert limiter.reserve() == pytest.approx(2, abs=0.05)
+
+
+def test_concurrent_callers_get_distinct_slots():
+    limiter = drained()
+    waits = []
+    lock = threading.Lock()
+
+    def reserve():
+        wait = limiter.reserve()
+        with lock:
+            waits.append(wait)
+
+    threads = [threading.Thread(target=reserve) for _ in range(10)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert sorted(waits) == pytest.approx(list(range(1, 11)), abs=0.1)
+
+
+def test_strictest_bucket_decides_the_wait():
+    limiter = RateLimiter(per_minute=60, per_day=2)
+    assert limiter.reserve() == 0
+    assert limiter.reserve() == 0
+    # The day bucket refills one slot every 43200s; the minute bucket is full
+    assert limiter.wait_time() == pytest.approx(43200, rel=0.01)
@@ -0,0 +1,57 @@
+import pytest
+from cache_backends import RedisBackend
+
+fakeredis = pytest.importorskip("fakeredis")
+
+KEY = ("OVERVIEW", "IBM", "_")
+
+
+class EvictedMidway(RedisBackend):
+    """Another replica evicts KEY right after this one reads its size."""
+
+    evicted = False
+
+    def _sizes(self, members):
+        sizes = super()._sizes(members)
+        if not self.evicted:
+            self.evicted = True
+            other = RedisBackend(client=self.r, prefix=self.prefix)
+            other.evict(max_rows=0, max_bytes=1)
+        return sizes
+
+
+@pytest.fixture
+def backend():
+    backend = EvictedMidway(client=fakeredis.FakeRedis())
+    backend.set_many([(KEY, b"payload", 1_000, 2_000, "d1")])
+    backend.evicted = False
+    return backend
+
+
+def assert_gone(backend):
+    assert not backend.r.exists(backend._entry(backend._member(KEY)))
+    assert backend.r.zcard(backend._expiry) == backend.r.zcard(backend._access) == 0
+    assert int(backend.r.get(backend._bytes)) == 0
+
+
+def test_renew_does_not_recreate_an_evicted_entry(backend):
+    backend.renew_many([(KEY, 3_000, 4_000)])
+    assert backend.evicted
+    assert_gone(backend)
+
+
+def test_touch_does_not_recreate_an_evicted_entry(backend):
+    backend.touch_many([(KEY, 3_000, 1)])
+    assert backend.evicted
+    assert_gone(backend)
+
+
+def test_renew_and_touch_update_existing_entries():
+    backend = RedisBackend(client=fakeredis.FakeRedis())
+    backend.set_many([(KEY, b"payload", 1_000, 2_000, "d1")])
+    backend.renew_many([(KEY, 3_000, 4_000)])
+    backend.touch_many([(KEY, 3_500, 2)])
+    _, ts, expires, _ = backend.get(KEY)
+    assert (ts, expires) == (3_000, 4_000)
+    meta = backend.metadata_many([KEY])[KEY]
+    assert meta["last_access"] == 3_500 and meta["hit_count"] == 2
@@ -0,0 +1,23 @@
+import threading
+from client import FETCH_MAX_WORKERS, run_per_symbol
+
+
+def test_results_keep_order_and_failures_stay_in_place():
+    def fn(symbol):
+        if symbol == "BAD":
+            raise ValueError(symbol)
+        return symbol.lower()
+
+    results = run_per_symbol(fn, ["A", "BAD", "C"], max_workers=2)
+    assert results[0] == "a" and results[2] == "c"
+    assert isinstance(results[1], ValueError)
+
+
+def test_max_workers_beyond_the_shared_pool_all_run_at_once():
+    workers = FETCH_MAX_WORKERS * 2
+    # Only passes once every worker is running at the same time
+    barrier = threading.Barrier(workers, timeout=5)
+    results = run_per_symbol(
+        lambda symbol: barrier.wait(), [str(i) for i in range(workers)], workers
+    )
+    assert not any(isinstance(r, Exception) for r in results)
@@ -0,0 +1,84 @@
+import time
+import pytest
+import client
+from cache_backends import encode_payload, payload_digest
+from client import AlphaVantageError, RateLimitExceeded
+
+
+@pytest.fixture
+def expired_entry():
+    """An OVERVIEW entry that expired an hour ago, only in the backend."""
+    client.MEMORY_CACHE.clear()
+    symbol = f"S{time.monotonic_ns()}"
+    payload = {"Symbol": symbol, "Name": "Stale Corp"}
+    fetched = int(time.time()) - 2 * 24 * 3600
+    client.CACHE.set_many(
+        [
+            (
+                ("OVERVIEW", symbol, "_"),
+                encode_payload(payload),
+                fetched,
+                int(time.time()) - 3600,
+                payload_digest(payload),
+            )
+        ]
+    )
+    return symbol, payload, fetched
+
+
+def failing(exc):
+    def upstream(*args, **kwargs):
+        raise exc
+
+    return upstream
+
+
+@pytest.mark.parametrize(
+    "error", [AlphaVantageError("Note: rate limited"), RateLimitExceeded(30.0)]
+)
+def test_expired_entry_is_served_when_upstream_refuses(expired_entry, monkeypatch, error):
+    symbol, payload, fetched = expired_entry
+    monkeypatch.setattr(client, "fetch_upstream", failing(error))
+    result = client._cached_api_result("OVERVIEW", symbol, stale_while_revalidate=False)
+    assert result.data == payload
+    assert result.stale and not result.revalidating
+    assert result.fetched_at == fetched
+
+
+def test_stale_fallback_can_be_disabled(expired_entry, monkeypatch):
+    symbol, _, _ = expired_entry
+    monkeypatch.setattr(client, "fetch_upstream", failing(AlphaVantageError("Note")))
+    with pytest.raises(AlphaVantageError):
+        client._cached_api_result(
+            "OVERVIEW", symbol, allow_stale_on_limit=False, stale_while_revalidate=False
+        )
+
+
+def test_without_a_cached_entry_the_error_propagates(monkeypatch):
+    client.MEMORY_CACHE.clear()
+    monkeypatch.setattr(client, "fetch_upstream", failing(AlphaVantageError("Note")))
+    with pytest.raises(AlphaVantageError):
+        client._cached_api_result("OVERVIEW", f"N{time.monotonic_ns()}")
+
+
+def test_other_errors_are_not_masked(expired_entry, monkeypatch):
+    symbol, _, _ = expired_entry
+    monkeypatch.setattr(client, "fetch_upstream", failing(ValueError("bad JSON")))
+    with pytest.raises(ValueError):
+        client._cached_api_result("OVERVIEW", symbol, stale_while_revalidate=False)
+
+
+def test_stale_while_revalidate_serves_stale_and_refreshes(expired_entry, monkeypatch):
+    symbol, payload, _ = expired_entry
+    fresh = {"Symbol": symbol, "Name": "Fresh Corp"}
+    monkeypatch.setattr(client, "fetch_upstream", lambda *args: fresh)
+    result = client._cached_api_result("OVERVIEW", symbol, stale_while_revalidate=True)
+    assert result.data == payload
+    assert result.stale and result.revalidating
+    deadline = time.time() + 5
+    while time.time() < deadline:
+        entry = client.cache_get("OVERVIEW", symbol, None, use_memory=False)
+        if entry["data"] == fresh:
+            break
+        time.sleep(0.05)
+    assert entry["data"] == fresh
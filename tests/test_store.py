@@ -0,0 +1,77 @@
+import time
+import pytest
+import client
+import store
+from cache_backends import encode_payload, payload_digest
+from fixtures import fixture_overview
+
+
+@pytest.fixture
+def symbols():
+    client.MEMORY_CACHE.clear()
+    stamp = time.monotonic_ns()
+    return [f"A{stamp}", f"B{stamp}"]
+
+
+@pytest.fixture
+def vendor_store(symbols):
+    vendor_store = store.VendorStore(symbols)
+    yield vendor_store
+    vendor_store.close()
+
+
+def renamed(symbol, name):
+    return {**fixture_overview(symbol, 7), "Name": name}
+
+
+def write_elsewhere(symbol, payload):
+    """Store payload as another process would: no change event here."""
+    ts = int(time.time())
+    client.CACHE.set_many(
+        [
+            (
+                ("OVERVIEW", symbol, "_"),
+                encode_payload(payload),
+                ts,
+                ts + 3600,
+                payload_digest(payload),
+            )
+        ]
+    )
+
+
+def test_reconcile_picks_up_entries_written_by_another_process(symbols, vendor_store):
+    for symbol in symbols:
+        client.cache_set("OVERVIEW", symbol, None, renamed(symbol, "Old"))
+    vendor_store.load()
+    version = vendor_store.version
+    write_elsewhere(symbols[0], renamed(symbols[0], "Elsewhere"))
+    vendor_store.reconcile(force=True)
+    frame = vendor_store.snapshot().frame
+    assert frame.loc[symbols[0], "Name"] == "Elsewhere"
+    assert frame.loc[symbols[1], "Name"] == "Old"
+    assert vendor_store.version == version + 1
+    # Nothing moved since, so nothing is upserted
+    vendor_store.reconcile(force=True)
+    assert vendor_store.version == version + 1
+
+
+def test_change_published_during_load_is_applied_after_it(
+    symbols, vendor_store, monkeypatch
+):
+    for symbol in symbols:
+        client.cache_set("OVERVIEW", symbol, None, renamed(symbol, "Old"))
+    fetch = store.get_company_overview_records
+
+    def racing(requested):
+        records = fetch(requested)
+        # The warmer refreshes an entry after load() has read it
+        client.cache_set("OVERVIEW", symbols[0], None, renamed(symbols[0], "Newer"))
+        return records
+
+    monkeypatch.setattr(store, "get_company_overview_records", racing)
+    vendor_store.load()
+    frame = vendor_store.snapshot().frame
+    assert frame.loc[symbols[0], "Name"] == "Newer"
+    assert frame.loc[symbols[1], "Name"] == "Old"
+    assert not vendor_store._deferred
@@ -0,0 +1,44 @@
+from datetime import date, datetime, timedelta
+from client import MARKET_TZ, TTL_POLICY, TtlPolicy
+
+
+def at(*args):
+    return datetime(*args, tzinfo=MARKET_TZ).timestamp()
+
+
+def test_friday_evening_fetch_is_kept_until_monday_settles():
+    fetched = at(2026, 10, 16, 19, 0)  # after Friday's figures are out
+    monday = at(2026, 10, 19, 18, 0)
+    assert TTL_POLICY.not_before("OVERVIEW", None, fetched) == monday
+    for _ in range(1_000):
+        # The 24h TTL alone, jitter and all, would expire over the weekend
+        assert TTL_POLICY.expires_at("OVERVIEW", "IBM", None, int(fetched)) >= monday
+
+
+def test_quarterly_rule_skips_unusable_report_dates():
+    policy = TtlPolicy(
+        {"INCOME_STATEMENT": 3600}, quarterly_functions={"INCOME_STATEMENT"}
+    )
+    payload = {
+        "quarterlyReports": [
+            {"fiscalDateEnding": None},
+            {"fiscalDateEnding": "not a date"},
+            "garbage",
+            {"fiscalDateEnding": "2026-06-30"},
+        ]
+    }
+    expected = date(2026, 6, 30) + timedelta(days=91) + policy.report_lag
+    assert policy.not_before("INCOME_STATEMENT", payload, 0) == at(
+        expected.year, expected.month, expected.day
+    )
+
+
+def test_quarterly_rule_without_any_report_date_falls_back_to_the_ttl():
+    policy = TtlPolicy(
+        {"INCOME_STATEMENT": 3600}, quarterly_functions={"INCOME_STATEMENT"}, jitter=0
+    )
+    payload = {"quarterlyReports": [{"fiscalDateEnding": None}]}
+    fetched = int(at(2026, 10, 16, 19, 0))
+    assert policy.not_before("INCOME_STATEMENT", payload, fetched) is None
+    expires = policy.expires_at("INCOME_STATEMENT", "IBM", payload, fetched)
+    assert expires == fetched + 3600
@@ -0,0 +1,224 @@
+import os
+import time
+import logging
+import threading
+from client import (
+    RATE_LIMIT_PER_DAY,
+    RATE_LIMIT_PER_MINUTE,
+    TTL_POLICY,
+    cache_get_many,
+    cache_metadata,
+    refresh_cache_entry,
+    run_cache_maintenance,
+)
+
+logger = logging.getLogger(__name__)
+
+WARM_FUNCTIONS = ("OVERVIEW", "INCOME_STATEMENT")
+# Refresh this long before an entry's TTL runs out
+WARM_LEAD_TIME = int(os.getenv("WARM_LEAD_TIME", "3600"))
+# Back-off before retrying an entry whose last refresh failed
+WARM_RETRY_AFTER = int(os.getenv("WARM_RETRY_AFTER", "900"))
+# How often the budget/vacuum pass over the cache runs; 0 disables it
+CACHE_MAINTENANCE_INTERVAL = int(os.getenv("CACHE_MAINTENANCE_INTERVAL", "600"))
+# Upper bound on how long the loop sleeps before re-reading the schedule
+WARM_POLL_INTERVAL = 60
+
+
+def _quota_spacing() -> float:
+    """Seconds between warm-up calls so they spread over the rate-limit window
+    instead of spending the whole bucket in one burst."""
+    spacing = [
+        window / limit
+        for limit, window in ((RATE_LIMIT_PER_MINUTE, 60), (RATE_LIMIT_PER_DAY, 86400))
+        if limit > 0
+    ]
+    return max(spacing, default=0.0)
+
+
+class CacheWarmer:
+    """Keeps cache entries for a watched set of symbols refreshed ahead of
+    their TTL, so interactive requests are served from cache."""
+
+    def __init__(
+        self,
+        symbols: list[str] = (),
+        functions: tuple[str, ...] = WARM_FUNCTIONS,
+        lead_time: int = WARM_LEAD_TIME,
+        spacing: float | None = None,
+        maintenance_interval: int = CACHE_MAINTENANCE_INTERVAL,
+    ):
+        self.functions = tuple(functions)
+        self.lead_time = lead_time
+        self.spacing = _quota_spacing() if spacing is None else spacing
+        self.maintenance_interval = maintenance_interval
+        self._next_maintenance = 0.0
+        self._maintenance: dict = {}
+        self._symbols: dict[str, None] = dict.fromkeys(symbols)
+        self._lock = threading.Lock()
+        self._wake = threading.Event()
+        self._stop = threading.Event()
+        self._thread: threading.Thread | None = None
+        self._last_call = 0.0
+        self._last_cycle_at: float | None = None
+        self._refreshed = 0
+        self._failed = 0
+        # (function, symbol) -> {"last_refresh_at", "last_error"}
+        self._history: dict[tuple[str, str], dict] = {}
+
+    def watch(self, symbols: list[str]):
+        with self._lock:
+            self._symbols.update(dict.fromkeys(symbols))
+        self._wake.set()
+
+    def unwatch(self, symbols: list[str]):
+        with self._lock:
+            for symbol in symbols:
+                self._symbols.pop(symbol, None)
+
+    @property
+    def symbols(self) -> list[str]:
+        with self._lock:
+            return list(self._symbols)
+
+    def schedule(self) -> list[dict]:
+        """Refresh timing for every watched entry, soonest first."""
+        now = time.time()
+        entries = []
+        symbols = self.symbols
+        for function in self.functions:
+            found = cache_metadata(function, symbols)
+            not_before = self._not_before(function, found, now)
+            for symbol in symbols:
+                meta = found.get(symbol, {})
+                fetched_at = meta.get("fetched_at")
+                expires_at = meta.get("expires_at")
+                refresh_at = expires_at - self.lead_time if expires_at else now
+                if symbol in not_before:
+                    # The lead time must not pull a refresh before the data can change
+                    refresh_at = max(refresh_at, not_before[symbol])
+                history = self._history.get((function, symbol), {})
+                if history.get("last_error"):
+                    refresh_at = max(
+                        refresh_at, history["last_refresh_at"] + WARM_RETRY_AFTER
+                    )
+                entries.append(
+                    {
+                        "function": function,
+                        "symbol": symbol,
+                        "fetched_at": fetched_at,
+                        "expires_at": expires_at,
+                        "next_refresh_at": refresh_at,
+                        "hit_count": meta.get("hit_count"),
+                        **history,
+                    }
+                )
+        entries.sort(key=lambda e: e["next_refresh_at"])
+        return entries
+
+    def _not_before(self, function: str, found: dict, now: float) -> dict:
+        """{symbol: not-before time} for the cached entries that are due.
+
+        Quarterly rules need the payload, so it is only read for entries the
+        lead time has already made due.
+        """
+        due = {
+            symbol: meta
+            for symbol, meta in found.items()
+            if meta.get("expires_at") and meta["expires_at"] - self.lead_time <= now
+        }
+        payloads = {}
+        if due and function in TTL_POLICY.quarterly_functions:
+            entries = cache_get_many(function, list(due))
+            payloads = {symbol: entry["data"] for symbol, entry in entries.items()}
+        result = {}
+        for symbol, meta in due.items():
+            value = TTL_POLICY.not_before(
+                function, payloads.get(symbol), meta["fetched_at"]
+            )
+            if value is not None:
+                result[symbol] = value
+        return result
+
+    def run_once(self) -> float:
+        """Refresh the most overdue entry if one is due and the quota spacing
+        allows it. Returns the number of seconds until there is work again."""
+        entries = self.schedule()
+        self._last_cycle_at = now = time.time()
+        if not entries:
+            return WARM_POLL_INTERVAL
+
+        entry = entries[0]
+        start_at = max(entry["next_refresh_at"], self._last_call + self.spacing)
+        if start_at > now:
+            return start_at - now
+
+        function, symbol = entry["function"], entry["symbol"]
+        self._last_call = now
+        history = self._history.setdefault((function, symbol), {})
+        try:
+            refresh_cache_entry(function, symbol)
+        except Exception as exc:
+            self._failed += 1
+            history["last_error"] = str(exc)
+            logger.warning("Pre-warm of %s %s failed: %s", function, symbol, exc)
+        else:
+            self._refreshed += 1
+            history["last_error"] = None
+        history["last_refresh_at"] = time.time()
+        return self.spacing
+
+    def _maybe_maintain(self) -> float:
+        """Run cache maintenance when it is due; returns seconds until the next run."""
+        if not self.maintenance_interval:
+            return WARM_POLL_INTERVAL
+        now = time.time()
+        if now >= self._next_maintenance:
+            self._next_maintenance = now + self.maintenance_interval
+            try:
+                self._maintenance = run_cache_maintenance()
+            except Exception:
+                logger.exception("Cache maintenance failed")
+        return self._next_maintenance - now
+
+    def _run(self):
+        while not self._stop.is_set():
+            try:
+                delay = min(self._maybe_maintain(), self.run_once())
+            except Exception:
+                logger.exception("Cache warmer cycle failed")
+                delay = WARM_POLL_INTERVAL
+            self._wake.wait(min(max(delay, 0.0), WARM_POLL_INTERVAL))
+            self._wake.clear()
+
+    def start(self):
+        if self._thread and self._thread.is_alive():
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(
+            target=self._run, name="cache-warmer", daemon=True
+        )
+        self._thread.start()
+
+    def stop(self, timeout: float | None = None):
+        self._stop.set()
+        self._wake.set()
+        if self._thread:
+            self._thread.join(timeout)
+
+    def status(self) -> dict:
+        """Snapshot of the warmer's timing for monitoring."""
+        entries = self.schedule()
+        return {
+            "running": bool(self._thread and self._thread.is_alive()),
+            "symbols": self.symbols,
+            "functions": list(self.functions),
+            "lead_time": self.lead_time,
+            "spacing": self.spacing,
+            "last_cycle_at": self._last_cycle_at,
+            "next_refresh_at": entries[0]["next_refresh_at"] if entries else None,
+            "refreshed": self._refreshed,
+            "failed": self._failed,
+            "cache": self._maintenance,
+            "entries": entries,
+        }